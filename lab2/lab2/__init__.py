@@ -1 +1 @@
-__all__ = ["lab2"]
\ No newline at end of file
+__all__ = ["lab2", "log_writer", "log_scanner", "log_store", "scheduler", "log_rotation", "log_follow"]
\ No newline at end of file
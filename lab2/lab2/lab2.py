@@ -1,55 +1,210 @@
 #  %%
 import aiofiles
 import asyncio
+import weakref
 from pathlib import Path
 from datetime import datetime
+from lab2.log_rotation import rotated_log_segments, compressed_log_segment, is_compressed, open_log_segment
+from lab2.log_scanner import _is_self_overlapping
+from lab2.log_writer import BufferedLogWriter
 
-async def read_logs(logFilePath:Path, keyword:str) -> int:
+# Characters read per chunk when counting keywords in a logfile
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+async def read_logs(logFilePath:Path, keyword:str, chunk_size:int | None = DEFAULT_CHUNK_SIZE, include_rotated:bool = True) -> int:
     """
     Returns the number of occurrences of `keyword` in a logfile
 
     Args:
         logFilePath (Path): Path to logfile
         keyword (str): Keyword to get the number of occurrences of.
+        chunk_size (int | None, optional): Characters to read at a time, see count_keyword_streaming.
+            * Defaults to DEFAULT_CHUNK_SIZE.
+            * None reads the whole logfile into memory at once.
+        include_rotated (bool, optional): Also count the logfile's rotated (possibly compressed) segments. Defaults to True.
+            * A missing live logfile is skipped if it has rotated segments, e.g. right after a rotation.
+
+    Returns:
+        int: number of occurrences
+    """
+    logFilePaths = [*rotated_log_segments(logFilePath), logFilePath] if include_rotated else [logFilePath]
+    count = 0
+    
+    for segmentPath in logFilePaths:
+        try:
+            count += await _count_keyword_in_log_file(segmentPath, keyword, chunk_size)
+            
+        except FileNotFoundError:
+            # Between a rotation and the next append there is no live logfile, only its rotated segments
+            if segmentPath == logFilePath:
+                if len(logFilePaths) == 1: raise
+                continue
+            
+            # The uncompressed copy of a segment is removed once its compressed copy is complete
+            compressedPath = compressed_log_segment(segmentPath)
+            if compressedPath is None: raise
+            count += await _count_keyword_in_log_file(compressedPath, keyword, chunk_size)
+    
+    await asyncio.sleep(0.3) # Artificial delay
+    
+    return count
+
+async def _count_keyword_in_log_file(logFilePath:Path, keyword:str, chunk_size:int | None) -> int:
+    if chunk_size is not None: return await count_keyword_streaming(logFilePath, keyword, chunk_size)
+    
+    if is_compressed(logFilePath): return (await asyncio.to_thread(_read_log_segment, logFilePath)).count(keyword)
+    
+    async with aiofiles.open(logFilePath, mode="r") as logFile:
+        return (await logFile.read()).count(keyword)
+
+async def count_keyword_streaming(logFilePath:Path, keyword:str, chunk_size:int = DEFAULT_CHUNK_SIZE) -> int:
+    """
+    Returns the number of occurrences of `keyword` in a logfile, reading it `chunk_size` characters at a time so memory
+    use does not grow with the size of the logfile.
+    
+    The last len(keyword) - 1 characters of every chunk are carried over to the next one, so occurrences split across
+    two chunks are still counted. Occurrences are counted without overlaps, the same as str.count.
+    
+    Rotated .gz / .zst segments are decompressed while they are read, in a worker thread.
+
+    Args:
+        logFilePath (Path): Path to logfile
+        keyword (str): Keyword to get the number of occurrences of.
+        chunk_size (int, optional): Characters to read at a time. Defaults to DEFAULT_CHUNK_SIZE.
 
     Returns:
         int: number of occurrences
     """
+    assert chunk_size > 0, "ERR: chunk_size must be positive"
+    
+    if is_compressed(logFilePath):
+        return await asyncio.to_thread(_count_keyword_in_segment, logFilePath, keyword, chunk_size)
+    
+    counter = _KeywordCounter(keyword)
+    
     async with aiofiles.open(logFilePath, mode="r") as logFile:
-        content = await logFile.read()
+        while chunk := await logFile.read(chunk_size):
+            counter.add_chunk(chunk)
+            
+    return counter.count
+
+class _KeywordCounter:
+    """
+    Counts the occurrences of a keyword in text that arrives in chunks, see count_keyword_streaming
+    """
+    
+    def __init__(self, keyword:str):
+        assert keyword, "ERR: keyword must not be empty"
+        
+        self.keyword = keyword
+        self.count = 0
+        self._overlap = len(keyword) - 1
+        self._carry = ""
+        self._is_self_overlapping = _is_self_overlapping(keyword)
+        
+    def add_chunk(self, chunk:str):
+        keyword = self.keyword
+        buffer = self._carry + chunk
+        last_match_end = 0
         
-        await asyncio.sleep(0.3) # Artificial delay
+        if self._is_self_overlapping:
+            position = buffer.find(keyword)
+            while position != -1:
+                self.count += 1
+                last_match_end = position + len(keyword)
+                position = buffer.find(keyword, last_match_end)
+                
+        else:
+            self.count += buffer.count(keyword)
+            last_match_start = buffer.rfind(keyword)
+            if last_match_start != -1: last_match_end = last_match_start + len(keyword)
         
-        return content.count(keyword)
+        # Characters that are already part of a counted occurrence are not carried over
+        self._carry = buffer[max(last_match_end, len(buffer) - self._overlap):]
+
+def _count_keyword_in_segment(logFilePath:Path, keyword:str, chunk_size:int) -> int:
+    counter = _KeywordCounter(keyword)
+    
+    with open_log_segment(logFilePath) as logFile:
+        while chunk := logFile.read(chunk_size):
+            counter.add_chunk(chunk)
+    
+    return counter.count
+
+def _read_log_segment(logFilePath:Path) -> str:
+    with open_log_segment(logFilePath) as logFile:
+        return logFile.read()
             
-# Stores locks for files (Key: fileName, Value: asyncio.Lock())
-file_locks = {}
+# Seconds a logfile stays open without being written to before log_message's writer closes it
+LOG_FILE_IDLE_TIMEOUT = 5.0
+
+# Messages queued before log_message waits for its writer to catch up
+LOG_FILE_QUEUE_SIZE = 1000
+
+# log_message's writer of every running event loop (Key: event loop, Value: BufferedLogWriter)
+log_writers = weakref.WeakKeyDictionary()
+def _log_writer() -> BufferedLogWriter:
+    loop = asyncio.get_running_loop()
+    
+    if loop not in log_writers:
+        log_writers[loop] = BufferedLogWriter(max_queue_size=LOG_FILE_QUEUE_SIZE, idle_timeout=LOG_FILE_IDLE_TIMEOUT)
+        
+    return log_writers[loop]
+
 async def log_message(logFilePath:Path, message:str):
     """
     Asynchronously logs a message to a logfile
 
+    The message is handed to the event loop's BufferedLogWriter and written shortly after, this only waits for disk I/O
+    while the writer does not have the logfile open (until the logfile exists) or when the writer's queue is full. Logfiles are closed once they have not been written to for LOG_FILE_IDLE_TIMEOUT seconds.
+    Use flush_logs() to wait until the messages are written and close_logs() to shut the writer down. Messages that
+    are still queued when the event loop stops (e.g. asyncio.run returning) are written before the logfiles are closed.
+    
+    Raises the error of an earlier failed write to the logfile, if any, instead of logging the message.
+
     Args:
         logFilePath (Path): Path to logfile to log messages to
         message (str): Message to log to the logfile
     """
     
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    log_entry = f"[{timestamp}] {message}\n"
+    writer = _log_writer()
     
-    if logFilePath not in file_locks:
-        file_locks[logFilePath] = asyncio.Lock()
-        
-    async with file_locks[logFilePath]:
-        print(f"Lock acquired: {message}")
-        
-        async with aiofiles.open(logFilePath, mode="a") as logFile:
-            await logFile.write(log_entry)
-            await asyncio.sleep(0.3) # Artificial delay
-            
-        print(f"Lock released: {message}")
+    # The logfile exists when this returns and errors opening it are raised here, like when every message opened it
+    if not writer.is_open(logFilePath): await asyncio.to_thread(_create_log_file, logFilePath)
+    
+    await writer.write(logFilePath, message)
+
+def _create_log_file(logFilePath:Path):
+    open(logFilePath, mode="a").close()
+
+async def flush_logs():
+    """
+    Waits until every message passed to log_message so far has been written to its logfile, then raises the error of a
+    failed write, if any
+    """
+    writer = log_writers.get(asyncio.get_running_loop())
+    
+    if writer is not None: await writer.flush()
+
+async def close_logs():
+    """
+    Writes the queued messages and closes the logfiles of log_message, e.g. before the program exits. The next
+    log_message call starts a new writer.
+    """
+    writer = log_writers.pop(asyncio.get_running_loop(), None)
+    
+    if writer is not None: await writer.aclose()
 
 async def main():
     import random
+    from lab2.scheduler import map_async
+    
+    # Logfiles open / messages in flight at a time
+    MAX_CONCURRENCY = 64
+    
+    # Size at which the logfiles are rotated into gzip compressed segments, read_logs still counts the rotated segments
+    LOG_FILE_MAX_BYTES = 1 << 20
+    
     LOG_FOLDER = Path(__file__).parent / "logs"
     LOG_FOLDER.mkdir(parents=True, exist_ok=True)
     
@@ -74,24 +229,18 @@ async def main():
     
     log_files = [f"log{i}.txt" for i in range(1, 6)]
     
-    tasks = []
-    
-    # Writing logs concurrently
+    # Writing logs concurrently, batched per file by the writer instead of one open / append / close per message
     print("Writing logs to files...")
-    for _ in range(100):
-        for logFile in log_files:
-            logMessageIndex = random.randint(0, len(log_files) - 1)
-            tasks.append(asyncio.create_task(log_message(LOG_FOLDER / logFile, log_messages[logMessageIndex])))
-            
-    print("================================= TASKS CREATED =================================")
-    
-    await asyncio.gather(*tasks)
+    async with BufferedLogWriter(max_bytes=LOG_FILE_MAX_BYTES) as writer:
+        log_entries = ((LOG_FOLDER / logFile, log_messages[random.randint(0, len(log_files) - 1)]) for _ in range(100) for logFile in log_files)
+        
+        await map_async(lambda log_entry: writer.write(*log_entry), log_entries, max_concurrency=MAX_CONCURRENCY)
     
     # Reading logs concurrently
     KEYWORD = "ERROR"
     
     print("\nReading logs and counting occurrences...")
-    counts = await asyncio.gather(*(read_logs(LOG_FOLDER / file, KEYWORD) for file in log_files))
+    counts = await map_async(lambda file: read_logs(LOG_FOLDER / file, KEYWORD), log_files, max_concurrency=MAX_CONCURRENCY)
     total_logs = sum(counts)
     print(f"Total '{KEYWORD}' occurrences across all logs: {total_logs}")
     
@@ -0,0 +1,241 @@
+import asyncio
+import ctypes
+import ctypes.util
+import os
+import struct
+import sys
+from pathlib import Path
+
+# Bytes read at a time when catching up on a logfile
+READ_CHUNK_SIZE = 1 << 20
+
+# inotify event masks, see inotify(7)
+_IN_MODIFY = 0x002
+_IN_MOVED_FROM = 0x040
+_IN_MOVED_TO = 0x080
+_IN_CREATE = 0x100
+_IN_DELETE = 0x200
+_INOTIFY_EVENT = struct.Struct("iIII")     # wd, mask, cookie, len, followed by a `len` bytes name
+
+def _load_inotify():
+    """
+    Returns libc if it provides inotify (Linux), otherwise None
+    """
+    if not sys.platform.startswith("linux"): return None
+
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+    except OSError:
+        return None
+
+    if not hasattr(libc, "inotify_init1"): return None
+
+    libc.inotify_add_watch.argtypes = (ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32)
+
+    return libc
+
+_libc = _load_inotify()
+
+class _InotifyWatcher:
+    """
+    Sets `changed` whenever the logfile is written, created, moved or deleted. The logfile's folder is watched rather
+    than the logfile itself, so the watch survives the logfile being rotated and recreated.
+    """
+
+    def __init__(self, logFilePath:Path):
+        self._fd = _libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0: raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        mask = _IN_MODIFY | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+        if _libc.inotify_add_watch(self._fd, os.fsencode(logFilePath.parent), mask) < 0:
+            error = OSError(ctypes.get_errno(), f"inotify_add_watch failed for {logFilePath.parent}")
+            os.close(self._fd)
+            raise error
+
+        self._name = os.fsencode(logFilePath.name)
+        self.changed = asyncio.Event()
+        self._loop = asyncio.get_running_loop()
+        self._loop.add_reader(self._fd, self._read_events)
+
+    def _read_events(self):
+        try:
+            events = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return
+
+        offset = 0
+        while offset < len(events):
+            _, _, _, name_length = _INOTIFY_EVENT.unpack_from(events, offset)
+            name = events[offset + _INOTIFY_EVENT.size:offset + _INOTIFY_EVENT.size + name_length].rstrip(b"\0")
+            offset += _INOTIFY_EVENT.size + name_length
+
+            if name == self._name: self.changed.set()
+
+    def close(self):
+        self._loop.remove_reader(self._fd)
+        os.close(self._fd)
+
+class LogFollower:
+    """
+    Follows a logfile like `tail -F` and counts keywords in the lines appended since the last check, so monitoring a live
+    logfile only costs work proportional to the new bytes.
+
+    The follower remembers the logfile's inode and the byte offset it has read up to. When the inode changes (the
+    logfile was rotated) the rest of the old logfile is read through the still open handle before the new logfile is
+    read from its start. A logfile that shrinks (was truncated) is read again from its start. Only complete lines are
+    counted, a partial last line is counted once its newline is written.
+
+    Usage:
+        follower = LogFollower(Path("logs/log1.txt"), ["ERROR", "WARNING"])
+        async for counts in follower.follow():
+            print(counts["ERROR"], follower.totals["ERROR"])
+    """
+
+    def __init__(self, logFilePath:Path, keywords:list[str], poll_interval:float = 1.0, from_start:bool = False, state:tuple[tuple[int, int], int] | None = None, use_inotify:bool = True):
+        """
+        Args:
+            logFilePath (Path): Path to logfile
+            keywords (list[str]): Keywords to count, keywords must not contain newlines
+            poll_interval (float, optional): Seconds between checks without inotify, and between safety checks with it. Defaults to 1.0.
+            from_start (bool, optional): Count the lines already in the logfile instead of only new ones. Defaults to False.
+            state (tuple | None, optional): `state` of an earlier follower of this logfile, to resume where it stopped.
+                * If the logfile has been rotated since, the new logfile is read from its start.
+            use_inotify (bool, optional): Wait for inotify events where available instead of polling. Defaults to True.
+        """
+        assert keywords and all(keywords) and not any("\n" in keyword for keyword in keywords), "ERR: keywords must be non-empty single line strings"
+
+        self.logFilePath = Path(logFilePath)
+        self.keywords = list(keywords)
+        self.poll_interval = poll_interval
+        self.use_inotify = use_inotify and _libc is not None
+        self.totals = dict.fromkeys(self.keywords, 0)
+
+        self._encoded_keywords = {keyword: keyword.encode() for keyword in self.keywords}
+        self._logFile = None
+        self._inode = None
+        self._partial_line = b""
+
+        self._open_log_file()
+        if self._logFile is not None:
+            if state is not None and state[0] == self._inode: self._logFile.seek(state[1])
+            elif state is None and not from_start: self._logFile.seek(0, os.SEEK_END)
+
+    @property
+    def state(self) -> tuple[tuple[int, int], int] | None:
+        """
+        Returns:
+            tuple[tuple[int, int], int] | None: ((device, inode), byte offset read up to) of the followed logfile, None if it does not exist yet
+        """
+        return (self._inode, self._logFile.tell() - len(self._partial_line)) if self._logFile is not None else None
+
+    def poll(self) -> dict[str, int]:
+        """
+        Reads what was appended to the logfile since the last call.
+
+        Returns:
+            dict[str, int]: Key: keyword, Value: occurrences in the new complete lines
+        """
+        return self._read_new_lines()[0]
+
+    async def follow(self):
+        """
+        Asynchronous generator that yields the keyword counts of the new lines every time the logfile grows.
+
+        Yields:
+            dict[str, int]: Key: keyword, Value: occurrences in the new complete lines
+        """
+        watcher = None
+        if self.use_inotify:
+            try:
+                watcher = _InotifyWatcher(self.logFilePath)
+            except OSError:
+                watcher = None     # e.g. out of inotify watches, poll instead
+
+        try:
+            while True:
+                if watcher is not None: watcher.changed.clear()
+
+                counts, num_bytes = await asyncio.to_thread(self._read_new_lines)
+                if num_bytes: yield counts
+
+                if watcher is None:
+                    await asyncio.sleep(self.poll_interval)
+                    continue
+
+                # Also re-check every poll_interval, in case the filesystem does not report changes (e.g. NFS)
+                try:
+                    async with asyncio.timeout(self.poll_interval):
+                        await watcher.changed.wait()
+                except TimeoutError:
+                    pass
+
+        finally:
+            if watcher is not None: watcher.close()
+
+    def close(self):
+        if self._logFile is not None: self._logFile.close()
+        self._logFile = None
+
+    def _open_log_file(self):
+        try:
+            self._logFile = open(self.logFilePath, "rb")
+        except FileNotFoundError:
+            self._logFile = self._inode = None
+            return
+
+        fileStat = os.fstat(self._logFile.fileno())
+        self._inode = (fileStat.st_dev, fileStat.st_ino)
+        self._partial_line = b""
+
+    def _read_new_lines(self) -> tuple[dict[str, int], int]:
+        """
+        Returns:
+            tuple[dict[str, int], int]: (keyword counts of the new complete lines, number of new bytes read)
+        """
+        counts = dict.fromkeys(self.keywords, 0)
+        num_bytes = 0
+
+        try:
+            fileStat = os.stat(self.logFilePath)
+        except FileNotFoundError:
+            fileStat = None
+
+        if self._logFile is not None:
+            if fileStat is None or (fileStat.st_dev, fileStat.st_ino) != self._inode:
+                # Rotated or deleted, the open handle still reads the rest of the old logfile
+                num_bytes += self._read_until_end(counts, is_final=True)
+                self.close()
+
+            elif fileStat.st_size < self._logFile.tell():
+                self._logFile.seek(0)
+                self._partial_line = b""
+
+        if self._logFile is None and fileStat is not None: self._open_log_file()
+
+        if self._logFile is not None: num_bytes += self._read_until_end(counts)
+
+        for keyword, count in counts.items(): self.totals[keyword] += count
+
+        return counts, num_bytes
+
+    def _read_until_end(self, counts:dict[str, int], is_final:bool = False) -> int:
+        num_bytes = 0
+
+        while chunk := self._logFile.read(READ_CHUNK_SIZE):
+            num_bytes += len(chunk)
+            lines = self._partial_line + chunk
+
+            # Only count up to the last newline, the rest of the chunk is carried over until its line is complete
+            end = lines.rfind(b"\n") + 1
+            self._partial_line = lines[end:]
+            self._count(lines[:end], counts)
+
+        if is_final:
+            self._count(self._partial_line, counts)
+            self._partial_line = b""
+
+        return num_bytes
+
+    def _count(self, lines:bytes, counts:dict[str, int]):
+        for keyword, encoded_keyword in self._encoded_keywords.items():
+            counts[keyword] += lines.count(encoded_keyword)
@@ -0,0 +1,129 @@
+import gzip
+import io
+import os
+import re
+import shutil
+from datetime import datetime
+from pathlib import Path
+
+# zstd support is optional: compression.zstd ships with Python 3.14+, the zstandard package works on older versions
+try:
+    from compression import zstd
+except ImportError:
+    try:
+        import zstandard as zstd
+    except ImportError:
+        zstd = None
+
+# Key: compression name, Value: suffix of the rotated segments it produces
+COMPRESSION_SUFFIXES = {None: "", "gzip": ".gz", "zstd": ".zst"}
+
+def rotate_log_file(logFilePath:Path, compression:str | None = "gzip") -> Path:
+    """
+    Moves a logfile aside as a rotated segment, named <logfile>.<YYYYmmdd-HHMMSS>-<n>[.gz | .zst], and compresses it.
+
+    The caller must have closed the logfile, the next append to `logFilePath` starts a new live logfile.
+    
+    The segment is compressed to a temporary name that rotated_log_segments does not list and only then renamed to its
+    final name, so readers never see a partly written segment. Until the uncompressed copy is removed, both copies
+    exist and rotated_log_segments lists the compressed one.
+
+    Args:
+        logFilePath (Path): Path to the live logfile
+        compression (str | None, optional): "gzip", "zstd" or None to keep the segment as plain text. Defaults to "gzip".
+
+    Returns:
+        Path: Path to the rotated segment
+    """
+    assert compression in COMPRESSION_SUFFIXES, f"ERR: compression must be one of {list(COMPRESSION_SUFFIXES)}"
+    assert compression != "zstd" or zstd is not None, "ERR: zstd compression needs Python 3.14+ or the zstandard package"
+
+    logFilePath = Path(logFilePath)
+    timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    segment_number = 0
+    while _rotated_name_exists(logFilePath, f"{timestamp}-{segment_number:03d}"): segment_number += 1
+
+    rotatedPath = logFilePath.with_name(f"{logFilePath.name}.{timestamp}-{segment_number:03d}")
+    os.replace(logFilePath, rotatedPath)
+
+    if compression is None: return rotatedPath
+
+    compressedPath = rotatedPath.with_name(rotatedPath.name + COMPRESSION_SUFFIXES[compression])
+    open_compressed = gzip.open if compression == "gzip" else zstd.open
+
+    temporaryPath = compressedPath.with_name(compressedPath.name + ".tmp")
+
+    with open(rotatedPath, "rb") as rotatedFile, open_compressed(temporaryPath, "wb") as compressedFile:
+        shutil.copyfileobj(rotatedFile, compressedFile, 1 << 20)
+
+    os.replace(temporaryPath, compressedPath)
+    rotatedPath.unlink()
+
+    return compressedPath
+
+def _rotated_name_exists(logFilePath:Path, rotation_id:str) -> bool:
+    return any(logFilePath.with_name(f"{logFilePath.name}.{rotation_id}{suffix}").exists() for suffix in COMPRESSION_SUFFIXES.values())
+
+def rotated_log_segments(logFilePath:Path) -> list[Path]:
+    """
+    Returns the rotated segments of a logfile, oldest first.
+
+    A segment that is being compressed is listed once, as its uncompressed copy until the compressed one is complete.
+
+    Args:
+        logFilePath (Path): Path to the live logfile
+
+    Returns:
+        list[Path]: Paths to the rotated segments, not including the live logfile
+    """
+    logFilePath = Path(logFilePath)
+    if not logFilePath.parent.exists(): return []
+
+    segment_pattern = re.compile(re.escape(logFilePath.name) + r"\.\d{8}-\d{6}-\d{3}(\.gz|\.zst)?")
+
+    # Key: segment name without compression suffix, Value: path, a compressed copy replaces the uncompressed one
+    segments = {}
+    for path in logFilePath.parent.iterdir():
+        segment_match = segment_pattern.fullmatch(path.name)
+        if segment_match is None: continue
+
+        suffix = segment_match.group(1) or ""
+        name = path.name.removesuffix(suffix)
+        if suffix or name not in segments: segments[name] = path
+
+    return [segments[name] for name in sorted(segments)]
+
+def compressed_log_segment(logFilePath:Path) -> Path | None:
+    """
+    Returns the compressed copy of an uncompressed rotated segment, None if there is none (yet).
+    """
+    logFilePath = Path(logFilePath)
+
+    for suffix in COMPRESSION_SUFFIXES.values():
+        compressedPath = logFilePath.with_name(logFilePath.name + suffix)
+        if suffix and compressedPath.exists(): return compressedPath
+
+    return None
+
+def is_compressed(logFilePath:Path) -> bool:
+    return Path(logFilePath).suffix in (".gz", ".zst")
+
+def open_log_segment(logFilePath:Path) -> io.TextIOBase:
+    """
+    Opens a live logfile or rotated segment for reading as text, decompressing .gz / .zst segments while reading.
+
+    Args:
+        logFilePath (Path): Path to the logfile or segment
+
+    Returns:
+        io.TextIOBase: Text stream of the logfile's content
+    """
+    suffix = Path(logFilePath).suffix
+
+    if suffix == ".gz": return gzip.open(logFilePath, "rt")
+
+    if suffix == ".zst":
+        assert zstd is not None, "ERR: Reading .zst segments needs Python 3.14+ or the zstandard package"
+        return zstd.open(logFilePath, "rt")
+
+    return open(logFilePath, "r")
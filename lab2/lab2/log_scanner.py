@@ -0,0 +1,116 @@
+import asyncio
+import mmap
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+# Bytes of the memory-mapped logfile searched at a time, small enough for every keyword's search to hit the CPU cache
+DEFAULT_WINDOW_SIZE = 4 << 20
+
+def _is_self_overlapping(keyword:str | bytes) -> bool:
+    # Occurrences of keywords like "aa" or b"abab" can overlap, so only a left to right scan matches str.count / bytes.count for them
+    return any(keyword[:i] == keyword[-i:] for i in range(1, len(keyword)))
+
+def _count_in_window(window:bytes, keyword:bytes, begin:int, stop:int, is_self_overlapping:bool) -> tuple[int, int]:
+    """
+    Counts the occurrences of `keyword` inside window[begin:stop] like bytes.count.
+
+    Returns:
+        tuple[int, int]: (number of occurrences, index in `window` where the last occurrence ends or 0 if there is none)
+    """
+    if is_self_overlapping:
+        count = last_match_end = 0
+        position = window.find(keyword, begin, stop)
+        while position != -1:
+            count += 1
+            last_match_end = position + len(keyword)
+            position = window.find(keyword, last_match_end, stop)
+
+        return count, last_match_end
+
+    last_match_start = window.rfind(keyword, begin, stop)
+
+    return window.count(keyword, begin, stop), (last_match_start + len(keyword) if last_match_start != -1 else 0)
+
+def count_keywords_in_file(logFilePath:Path, keywords:list[str], window_size:int = DEFAULT_WINDOW_SIZE) -> dict[str, int]:
+    """
+    Returns the number of occurrences of every keyword in a logfile, reading the logfile only once.
+
+    The logfile is memory-mapped and copied out `window_size` bytes at a time. Every keyword is counted in the window
+    while it is still in the CPU cache, so the logfile is read from disk once whatever the number of keywords.
+    Each keyword is counted like str.count, including occurrences that straddle two windows.
+
+    Args:
+        logFilePath (Path): Path to logfile
+        keywords (list[str]): Keywords to get the number of occurrences of
+        window_size (int, optional): Bytes searched at a time. Defaults to DEFAULT_WINDOW_SIZE.
+
+    Returns:
+        dict[str, int]: Key: keyword, Value: number of occurrences
+    """
+    assert keywords and all(keywords), "ERR: keywords must be a non-empty list of non-empty strings"
+    assert window_size > 0, "ERR: window_size must be positive"
+
+    encoded_keywords = {keyword: keyword.encode() for keyword in keywords}
+    is_self_overlapping = {keyword: _is_self_overlapping(encoded_keyword) for keyword, encoded_keyword in encoded_keywords.items()}
+    counts = dict.fromkeys(encoded_keywords, 0)
+
+    # Key: keyword, Value: file offset to resume counting from, past the end of the keyword's last counted occurrence
+    resume_offsets = dict.fromkeys(encoded_keywords, 0)
+    overlap = max(len(encoded_keyword) for encoded_keyword in encoded_keywords.values()) - 1
+
+    with open(logFilePath, "rb") as logFile:
+        file_size = os.fstat(logFile.fileno()).st_size
+        if file_size == 0: return counts
+
+        with mmap.mmap(logFile.fileno(), 0, access=mmap.ACCESS_READ) as mappedLogFile:
+            for start in range(0, file_size, window_size):
+                end = min(start + window_size, file_size)
+
+                # Extended by `overlap` bytes so occurrences starting before `end` are complete
+                window = mappedLogFile[start:min(end + overlap, file_size)]
+
+                for keyword, encoded_keyword in encoded_keywords.items():
+                    count, last_match_end = _count_in_window(window, encoded_keyword, resume_offsets[keyword] - start, end - start + len(encoded_keyword) - 1, is_self_overlapping[keyword])
+
+                    counts[keyword] += count
+                    resume_offsets[keyword] = max(resume_offsets[keyword], start + last_match_end, end)
+
+    return counts
+
+def _count_keywords_in_files(logFilePaths:list[Path], keywords:list[str], window_size:int) -> list[dict[str, int]]:
+    return [count_keywords_in_file(logFilePath, keywords, window_size) for logFilePath in logFilePaths]
+
+async def scan_logs(logFilePaths:list[Path], keywords:list[str], max_workers:int | None = None, files_per_task:int | None = None, window_size:int = DEFAULT_WINDOW_SIZE) -> dict[Path, dict[str, int]]:
+    """
+    Counts every keyword in every logfile, spreading the logfiles across a process pool.
+
+    Each logfile is read once whatever the number of keywords. Logfiles are sent to the workers in batches of
+    `files_per_task` so thousands of small logfiles do not pay one round trip to a worker each.
+
+    Args:
+        logFilePaths (list[Path]): Paths to logfiles
+        keywords (list[str]): Keywords to get the number of occurrences of
+        max_workers (int | None, optional): Worker processes, defaults to os.cpu_count(). 1 scans in a thread of this process.
+        files_per_task (int | None, optional): Logfiles per worker task, defaults to about 4 tasks per worker.
+        window_size (int, optional): See count_keywords_in_file. Defaults to DEFAULT_WINDOW_SIZE.
+
+    Returns:
+        dict[Path, dict[str, int]]: Key: logfile path, Value: {keyword: number of occurrences}
+    """
+    logFilePaths = list(logFilePaths)
+    max_workers = max_workers or os.cpu_count() or 1
+
+    if max_workers == 1 or len(logFilePaths) <= 1:
+        counts = await asyncio.to_thread(_count_keywords_in_files, logFilePaths, keywords, window_size)
+        return dict(zip(logFilePaths, counts))
+
+    files_per_task = files_per_task or max(1, -(-len(logFilePaths) // (max_workers * 4)))
+    batches = [logFilePaths[start:start + files_per_task] for start in range(0, len(logFilePaths), files_per_task)]
+
+    loop = asyncio.get_running_loop()
+
+    with ProcessPoolExecutor(max_workers=min(max_workers, len(batches))) as executor:
+        batch_counts = await asyncio.gather(*(loop.run_in_executor(executor, _count_keywords_in_files, batch, keywords, window_size) for batch in batches))
+
+    return {logFilePath: counts for batch, counts in zip(batches, batch_counts) for logFilePath, counts in zip(batch, counts)}
@@ -0,0 +1,306 @@
+import re
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from pathlib import Path
+from typing import NamedTuple
+
+# Matches the level prefix of a lab2 log message, e.g. "ERROR: Failed to connect to the database."
+LEVEL_PATTERN = re.compile(r"([A-Z]+): ")
+
+class LogRecord(NamedTuple):
+    timestamp: datetime
+    level: str
+    message: str
+
+def _parse_line(line:bytes) -> LogRecord:
+    # Lines look like b"[2025-02-03 21:02:42] ERROR: Failed to connect to the database.\n"
+    text = line.decode().rstrip("\n")
+    message = text[22:]
+    level_match = LEVEL_PATTERN.match(message)
+
+    return LogRecord(datetime.fromisoformat(text[1:20]), level_match.group(1) if level_match else "", message)
+
+class _Segment:
+    """
+    One append-only segment file plus its indexes, each stored as int64 (timestamp, offset) pairs:
+        * <segment>.time.idx: Sparse timestamp index, one pair every `index_interval` records
+        * <segment>.level-<LEVEL>.idx: Every record of that level
+        * <segment>.clean.idx: Size of the segment (a single int64) when it was closed, only there while the indexes are complete
+    """
+
+    def __init__(self, data_path:Path):
+        self.data_path = data_path
+        self.size = data_path.stat().st_size if data_path.exists() else 0
+        self.time_timestamps = array("q")
+        self.time_offsets = array("q")
+        self.level_timestamps:dict[str, array] = {}
+        self.level_offsets:dict[str, array] = {}
+        self.last_timestamp = -1
+        self.records_since_index = 0
+
+        self._data_file = None
+        self._index_files = {}      # Key: index path, Value: open file handle
+
+    def index_path(self, name:str) -> Path:
+        return self.data_path.with_suffix(f".{name}.idx")
+
+    def load(self, index_interval:int):
+        """
+        Loads the indexes from disk. Every index file has its own write buffer, so after a crash they can each have lost
+        a different number of entries. The indexes are only trusted if the segment was closed cleanly with this size,
+        otherwise they are rebuilt from the segment file.
+        """
+        if self._clean_size() != self.size:
+            self.reindex(index_interval)
+            return
+
+        try:
+            if self.size:
+                self.time_timestamps, self.time_offsets = self._read_pairs(self.index_path("time"))
+
+            for level_index_path in self.data_path.parent.glob(f"{self.data_path.stem}.level-*.idx"):
+                level = level_index_path.name[len(self.data_path.stem) + len(".level-"):-len(".idx")]
+                self.level_timestamps[level], self.level_offsets[level] = self._read_pairs(level_index_path)
+
+                if self.level_timestamps[level]: self.last_timestamp = max(self.last_timestamp, self.level_timestamps[level][-1])
+
+        except (FileNotFoundError, ValueError):
+            self.reindex(index_interval)
+            return
+
+        # Unknown after a restart, so the next record gets a sparse index entry
+        self.records_since_index = index_interval
+
+    def reindex(self, index_interval:int):
+        for index_path in self.data_path.parent.glob(f"{self.data_path.stem}.*.idx"): index_path.unlink()
+
+        self.time_timestamps, self.time_offsets = array("q"), array("q")
+        self.level_timestamps.clear()
+        self.level_offsets.clear()
+        self.last_timestamp = -1
+        self.records_since_index = index_interval
+
+        self._index_records(0, index_interval)
+
+    def _index_records(self, offset:int, index_interval:int):
+        """
+        Adds the records from `offset` to the end of the segment file to the indexes.
+        """
+        with open(self.data_path, "rb+") as dataFile:
+            dataFile.seek(offset)
+
+            for line in dataFile:
+                # Cut off a record that was only partly written before a crash
+                if not line.endswith(b"\n"):
+                    dataFile.truncate(offset)
+                    break
+
+                record = _parse_line(line)
+                self.add_to_indexes(int(record.timestamp.timestamp()), record.level, offset, index_interval)
+                offset += len(line)
+
+        self.size = offset
+        self.flush()
+
+    def add_to_indexes(self, timestamp:int, level:str, offset:int, index_interval:int):
+        if self.records_since_index >= index_interval:
+            self.time_timestamps.append(timestamp)
+            self.time_offsets.append(offset)
+            self._append_pair("time", timestamp, offset)
+            self.records_since_index = 0
+
+        self.level_timestamps.setdefault(level, array("q")).append(timestamp)
+        self.level_offsets.setdefault(level, array("q")).append(offset)
+        self._append_pair(f"level-{level}", timestamp, offset)
+
+        self.records_since_index += 1
+        self.last_timestamp = timestamp
+
+    def append(self, timestamp:int, level:str, line:bytes, index_interval:int):
+        if self._data_file is None:
+            # Removed before the first write, so a crash from here on makes the next load rebuild the indexes
+            self.index_path("clean").unlink(missing_ok=True)
+            self._data_file = open(self.data_path, "ab")
+
+        # The data is written before the indexes, so the indexes never point past the end of the segment
+        self._data_file.write(line)
+        self.add_to_indexes(timestamp, level, self.size, index_interval)
+        self.size += len(line)
+
+    def flush(self):
+        if self._data_file is not None: self._data_file.flush()
+        for indexFile in self._index_files.values(): indexFile.flush()
+
+    def close(self):
+        if self._data_file is not None: self._data_file.close()
+        for indexFile in self._index_files.values(): indexFile.close()
+
+        self._data_file = None
+        self._index_files.clear()
+
+        # Written after every index is complete on disk, see load
+        if self.data_path.exists(): self.index_path("clean").write_bytes(array("q", (self.size,)).tobytes())
+
+    def _clean_size(self) -> int:
+        """
+        Returns the size of the segment when it was last closed cleanly, -1 if it was not.
+        """
+        try:
+            return array("q", self.index_path("clean").read_bytes()).pop()
+        except (FileNotFoundError, IndexError, ValueError):
+            return -1
+
+    def _append_pair(self, name:str, timestamp:int, offset:int):
+        index_path = self.index_path(name)
+
+        if index_path not in self._index_files: self._index_files[index_path] = open(index_path, "ab")
+
+        self._index_files[index_path].write(array("q", (timestamp, offset)).tobytes())
+
+    @staticmethod
+    def _read_pairs(index_path:Path) -> tuple[array, array]:
+        """
+        Raises ValueError if the index file ends in a partly written pair.
+        """
+        pairs = array("q")
+        index_bytes = index_path.read_bytes()
+
+        if len(index_bytes) % (2 * pairs.itemsize): raise ValueError(f"ERR: Torn index file: {index_path}")
+
+        pairs.frombytes(index_bytes)
+
+        return pairs[0::2], pairs[1::2]
+
+class LogStore:
+    """
+    Structured, indexed log storage for time range and level queries.
+
+    Records are appended to segment files in the same "[timestamp] LEVEL: message" text format as lab2.log_message, so
+    the segments can still be read with read_logs / scan_logs. Every segment has a sparse timestamp index and one offset
+    index per level, so query() bisects straight to the matching records instead of scanning the whole log.
+
+    Records must be appended in time order. A timestamp older than the previous record (e.g. after the system clock is
+    set back) is stored with the previous record's timestamp.
+
+    Usage:
+        with LogStore(Path("logs/store")) as store:
+            store.append("ERROR: Failed to connect to the database.")
+            store.query("ERROR", start=datetime(2025, 2, 3, 21), end=datetime(2025, 2, 3, 22))
+    """
+
+    def __init__(self, directory:Path, segment_size:int = 64 << 20, index_interval:int = 256):
+        """
+        Args:
+            directory (Path): Folder holding the segments and their indexes, created if it does not exist
+            segment_size (int, optional): Bytes after which a new segment is started. Defaults to 64 MiB.
+            index_interval (int, optional): Records between two sparse timestamp index entries. Defaults to 256.
+        """
+        assert segment_size > 0, "ERR: segment_size must be positive"
+        assert index_interval > 0, "ERR: index_interval must be positive"
+
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.segment_size = segment_size
+        self.index_interval = index_interval
+
+        self._segments:list[_Segment] = []
+        for data_path in sorted(self.directory.glob("segment-*.log")):
+            segment = _Segment(data_path)
+            segment.load(index_interval)
+            self._segments.append(segment)
+
+        if not self._segments: self._start_segment()
+
+    def append(self, message:str, timestamp:datetime | None = None):
+        """
+        Appends one log record.
+
+        Args:
+            message (str): Message to log, its "LEVEL: " prefix (if any) is indexed as the record's level
+            timestamp (datetime | None, optional): Time of the record. Defaults to now.
+        """
+        assert "\n" not in message, "ERR: message must be a single line"
+
+        timestamp = (timestamp or datetime.now()).replace(microsecond=0)
+        epoch_timestamp = int(timestamp.timestamp())
+
+        segment = self._segments[-1]
+        if epoch_timestamp < segment.last_timestamp:
+            epoch_timestamp = segment.last_timestamp
+            timestamp = datetime.fromtimestamp(epoch_timestamp)
+
+        if segment.size >= self.segment_size:
+            segment = self._start_segment()
+
+        level_match = LEVEL_PATTERN.match(message)
+        line = f"[{timestamp.strftime('%Y-%m-%d %H:%M:%S')}] {message}\n".encode()
+
+        segment.append(epoch_timestamp, level_match.group(1) if level_match else "", line, self.index_interval)
+
+    def query(self, level:str | None = None, start:datetime | None = None, end:datetime | None = None) -> list[LogRecord]:
+        """
+        Returns the records of `level` logged between `start` and `end` (both inclusive), oldest first.
+
+        Args:
+            level (str | None, optional): Level to return, e.g. "ERROR". Defaults to every level.
+            start (datetime | None, optional): Earliest timestamp to return. Defaults to the first record.
+            end (datetime | None, optional): Latest timestamp to return. Defaults to the last record.
+
+        Returns:
+            list[LogRecord]: Matching records
+        """
+        self.flush()
+
+        start_timestamp = int(start.replace(microsecond=0).timestamp()) if start else -1
+        end_timestamp = int(end.timestamp()) if end else 2**63 - 1
+        records = []
+
+        for segment in self._segments:
+            if not segment.time_timestamps or segment.time_timestamps[0] > end_timestamp or segment.last_timestamp < start_timestamp: continue
+
+            with open(segment.data_path, "rb") as dataFile:
+                if level is not None:
+                    timestamps = segment.level_timestamps.get(level, array("q"))
+                    offsets = segment.level_offsets.get(level, array("q"))
+
+                    for offset in offsets[bisect_left(timestamps, start_timestamp):bisect_right(timestamps, end_timestamp)]:
+                        dataFile.seek(offset)
+                        records.append(_parse_line(dataFile.readline()))
+
+                    continue
+
+                # The last sparse index entry before `start` is a safe place to start scanning from
+                index_position = bisect_left(segment.time_timestamps, start_timestamp) - 1
+                dataFile.seek(segment.time_offsets[index_position] if index_position >= 0 else 0)
+
+                for line in dataFile:
+                    record = _parse_line(line)
+                    record_timestamp = int(record.timestamp.timestamp())
+
+                    if record_timestamp > end_timestamp: break
+                    if record_timestamp >= start_timestamp: records.append(record)
+
+        return records
+
+    def flush(self):
+        self._segments[-1].flush()
+
+    def close(self):
+        for segment in self._segments: segment.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _start_segment(self) -> _Segment:
+        if self._segments: self._segments[-1].close()
+
+        segment = _Segment(self.directory / f"segment-{len(self._segments):06d}.log")
+        segment.records_since_index = self.index_interval
+        if self._segments: segment.last_timestamp = self._segments[-1].last_timestamp
+        self._segments.append(segment)
+
+        return segment
@@ -0,0 +1,282 @@
+import asyncio
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from datetime import datetime
+from lab2.log_rotation import rotate_log_file, COMPRESSION_SUFFIXES
+
+class BufferedLogWriter:
+    """
+    Asynchronous log sink that batches log entries per file.
+
+    write() only formats the entry and puts it on a bounded queue. A single background task takes entries off the
+    queue, groups them by file and writes each group with one write call to a file handle that stays open until
+    aclose() (or until it is idle, see `idle_timeout`). A batch is written once `max_batch_size` entries are queued or `flush_interval` seconds have passed since
+    its first entry, whichever comes first. The file I/O of a batch runs in a worker thread owned by the writer, so a
+    batch costs one thread hop however many files it touches.
+
+    When the queue holds `max_queue_size` entries, write() waits for the background task to catch up (backpressure).
+
+    With `max_bytes` / `max_age` set, a logfile that would grow past `max_bytes` or has been written to by this writer
+    for `max_age` seconds is rotated before the next batch (see log_rotation.rotate_log_file), and writing continues in a
+    new live logfile. read_logs counts the live logfile together with its rotated segments.
+
+    With `idle_timeout` set, a logfile that has not been written to for `idle_timeout` seconds is closed, so the number
+    of open files stays bounded by the files written to recently.
+
+    A failed write is kept and raised from the next write() to the same logfile or the next flush(). If the event loop
+    cancels the background task without aclose() (e.g. asyncio.run returning), the queued entries are still written
+    before the files are closed.
+
+    Usage:
+        async with BufferedLogWriter() as writer:
+            await writer.write(Path("logs/log1.txt"), "INFO: User login successful.")
+            await writer.flush()    # Optional, entries written so far are on disk after this
+    """
+
+    def __init__(self, max_batch_size:int = 512, flush_interval:float = 0.05, max_queue_size:int = 10_000, max_bytes:int | None = None, max_age:float | None = None, compression:str | None = "gzip", idle_timeout:float | None = None):
+        """
+        Args:
+            max_batch_size (int, optional): Number of entries that triggers a write. Defaults to 512.
+            flush_interval (float, optional): Seconds an entry may wait for its batch to fill up. Defaults to 0.05.
+            max_queue_size (int, optional): Number of queued entries at which write() starts waiting. Defaults to 10_000.
+            max_bytes (int | None, optional): Size in bytes at which a logfile is rotated. Defaults to no size limit.
+            max_age (float | None, optional): Seconds after which a logfile is rotated. Defaults to no time limit.
+            compression (str | None, optional): "gzip", "zstd" or None, compression of rotated segments. Defaults to "gzip".
+            idle_timeout (float | None, optional): Seconds without writes after which a logfile is closed. Defaults to keeping it open until aclose().
+        """
+        assert max_batch_size > 0, "ERR: max_batch_size must be positive"
+        assert max_queue_size > 0, "ERR: max_queue_size must be positive"
+        assert compression in COMPRESSION_SUFFIXES, f"ERR: compression must be one of {list(COMPRESSION_SUFFIXES)}"
+        assert idle_timeout is None or idle_timeout > 0, "ERR: idle_timeout must be positive"
+
+        self.max_batch_size = max_batch_size
+        self.flush_interval = flush_interval
+        self._queue:asyncio.Queue = asyncio.Queue(max_queue_size)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.compression = compression
+        self.idle_timeout = idle_timeout
+        self._log_files = OrderedDict()     # Key: logFilePath, Value: open file, least recently written first
+        self._log_file_sizes = {}           # Key: logFilePath, Value: bytes in the live logfile
+        self._log_file_opened_at = {}       # Key: logFilePath, Value: time.monotonic() the live logfile was opened
+        self._log_file_written_at = {}      # Key: logFilePath, Value: time.monotonic() of the last write
+        self._errors:dict[Path, Exception] = {}     # Key: logFilePath, Value: error of a failed write that was not raised yet
+        self._batch:dict[Path, list[str]] = {}      # Entries taken off the queue that are not being written yet
+        self._batch_size = 0
+        self._job:Future | None = None      # Worker thread job the background task is waiting for
+        self._job_batch:dict[Path, list[str]] = {}     # Entries being written by self._job
+        self._job_batch_size = 0
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="BufferedLogWriter")
+        self._writer_task:asyncio.Task | None = None
+        self._closed = False
+
+    async def write(self, logFilePath:Path, message:str):
+        """
+        Queues a timestamped message for `logFilePath`, waiting only if the queue is full.
+
+        Raises the error of an earlier failed write to `logFilePath`, if any, instead of queueing the message.
+
+        Args:
+            logFilePath (Path): Path to logfile to log messages to
+            message (str): Message to log to the logfile
+        """
+        assert not self._closed, "ERR: Writer is closed"
+        self._raise_error(logFilePath)
+
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+        if self._writer_task is None:
+            self._writer_task = asyncio.create_task(self._write_batches())
+
+        await self._queue.put((logFilePath, f"[{timestamp}] {message}\n"))
+
+    def is_open(self, logFilePath:Path) -> bool:
+        """
+        Returns True while the writer holds `logFilePath` open, see `idle_timeout`.
+        """
+        return logFilePath in self._log_files
+
+    async def flush(self):
+        """
+        Waits until every entry queued so far has been written and flushed to its file, then raises the error of a
+        failed write, if any.
+        """
+        await self._queue.join()
+        self._raise_error()
+
+    async def aclose(self):
+        """
+        Flushes the queued entries, stops the background task and closes every file handle.
+        """
+        if self._closed: return
+
+        try:
+            await self.flush()
+
+        finally:
+            self._closed = True
+
+            if self._writer_task is not None:
+                self._writer_task.cancel()
+                await asyncio.gather(self._writer_task, return_exceptions=True)
+            else:
+                self._executor.shutdown()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+
+    def _raise_error(self, logFilePath:Path | None = None):
+        """
+        Raises the error of a failed write to `logFilePath` (any logfile if None), if any, only once.
+        """
+        if logFilePath is None: logFilePath = next(iter(self._errors), None)
+
+        if logFilePath in self._errors: raise self._errors.pop(logFilePath)
+
+    async def _write_batches(self):
+        try:
+            while True:
+                await self._collect_batch()
+
+                self._job_batch, self._job_batch_size = self._batch, self._batch_size
+                self._batch, self._batch_size = {}, 0
+
+                await self._run_job(self._write_log_entries, self._job_batch)
+
+                for _ in range(self._job_batch_size): self._queue.task_done()
+                self._job_batch, self._job_batch_size = {}, 0
+
+        except asyncio.CancelledError:
+            self._write_remaining_entries()
+            raise
+
+    async def _collect_batch(self):
+        """
+        Takes the next batch of entries off the queue into self._batch, closing idle logfiles while the queue is empty.
+        """
+        loop = asyncio.get_running_loop()
+
+        while True:
+            try:
+                async with asyncio.timeout(self.idle_timeout if self.idle_timeout is not None and self._log_files else None):
+                    logFilePath, log_entry = await self._queue.get()
+                break
+            except TimeoutError:
+                await self._run_job(self._close_idle_log_files, time.monotonic())
+
+        self._batch.setdefault(logFilePath, []).append(log_entry)
+        self._batch_size += 1
+        deadline = loop.time() + self.flush_interval
+
+        # Fill the batch with whatever is already queued, then wait for more until the deadline
+        while self._batch_size < self.max_batch_size:
+            try:
+                logFilePath, log_entry = self._queue.get_nowait()
+
+            except asyncio.QueueEmpty:
+                timeout = deadline - loop.time()
+                if timeout <= 0: break
+
+                try:
+                    async with asyncio.timeout(timeout):
+                        logFilePath, log_entry = await self._queue.get()
+                except TimeoutError:
+                    break
+
+            self._batch.setdefault(logFilePath, []).append(log_entry)
+            self._batch_size += 1
+
+    async def _run_job(self, function, *args):
+        """
+        Runs function(*args) in the worker thread, self._job lets a cancelled background task find out whether it ran.
+        """
+        self._job = self._executor.submit(function, *args)
+        await asyncio.wrap_future(self._job)
+
+    def _write_remaining_entries(self):
+        """
+        Writes the entries that are still queued or in the batch of a cancelled job and closes every file handle.
+        Runs in the event loop's thread once the background task is cancelled, the worker thread is idle afterwards.
+        """
+        remaining_batch = {}
+        num_entries = self._job_batch_size + self._batch_size
+
+        if self._job is not None:
+            # A job that was cancelled before the worker thread started it never ran, a started one is waited for
+            if self._job.cancelled(): remaining_batch = self._job_batch
+            else: self._job.exception()
+
+        for logFilePath, log_entries in self._batch.items(): remaining_batch.setdefault(logFilePath, []).extend(log_entries)
+
+        while not self._queue.empty():
+            logFilePath, log_entry = self._queue.get_nowait()
+            remaining_batch.setdefault(logFilePath, []).append(log_entry)
+            num_entries += 1
+
+        self._write_log_entries(remaining_batch)
+
+        for _ in range(num_entries): self._queue.task_done()
+
+        for logFile in self._log_files.values(): logFile.close()
+        self._log_files.clear()
+        self._executor.shutdown(wait=False)
+
+    def _write_log_entries(self, entries_from_file:dict[Path, list[str]]):
+        """
+        Writes a batch, one write call per logfile. Runs in the worker thread.
+        """
+        for logFilePath, log_entries in entries_from_file.items():
+            try:
+                data = "".join(log_entries)
+                logFile = self._open_log_file(logFilePath, len(data.encode()))
+
+                logFile.write(data)
+                logFile.flush()
+
+            except Exception as error:
+                self._errors[logFilePath] = error  # Raised from the next write() / flush()
+
+        if self.idle_timeout is not None: self._close_idle_log_files(time.monotonic())
+
+    def _close_idle_log_files(self, now:float):
+        # Least recently written first, so only the idle logfiles are visited
+        while self._log_files:
+            logFilePath = next(iter(self._log_files))
+            if now - self._log_file_written_at[logFilePath] < self.idle_timeout: break
+
+            self._log_files.pop(logFilePath).close()
+            del self._log_file_sizes[logFilePath], self._log_file_opened_at[logFilePath], self._log_file_written_at[logFilePath]
+
+    def _open_log_file(self, logFilePath:Path, num_bytes:int):
+        """
+        Returns the open handle of a logfile, rotating the logfile first if writing `num_bytes` more is due to rotate it.
+        """
+        now = time.monotonic()
+
+        if logFilePath not in self._log_files:
+            self._log_files[logFilePath] = open(logFilePath, mode="a")
+            self._log_file_sizes[logFilePath] = self._log_files[logFilePath].tell()
+            self._log_file_opened_at[logFilePath] = now
+
+        size = self._log_file_sizes[logFilePath]
+        is_too_big = self.max_bytes is not None and size + num_bytes > self.max_bytes
+        is_too_old = self.max_age is not None and now - self._log_file_opened_at[logFilePath] >= self.max_age
+
+        if size > 0 and (is_too_big or is_too_old):
+            self._log_files.pop(logFilePath).close()
+            rotate_log_file(logFilePath, self.compression)
+
+            self._log_files[logFilePath] = open(logFilePath, mode="a")
+            self._log_file_sizes[logFilePath] = 0
+            self._log_file_opened_at[logFilePath] = now
+
+        self._log_files.move_to_end(logFilePath)
+        self._log_file_sizes[logFilePath] += num_bytes
+        self._log_file_written_at[logFilePath] = now
+
+        return self._log_files[logFilePath]
@@ -0,0 +1,63 @@
+import asyncio
+from operator import itemgetter
+from typing import Any, Awaitable, Callable, Iterable
+
+# Coroutines map_async runs at the same time unless told otherwise
+DEFAULT_MAX_CONCURRENCY = 64
+
+async def map_async(function:Callable[[Any], Awaitable[Any]], items:Iterable, max_concurrency:int = DEFAULT_MAX_CONCURRENCY, ordered:bool = True, timeout:float | None = None, return_exceptions:bool = False) -> list:
+    """
+    Awaits function(item) for every item with at most `max_concurrency` calls in flight at a time.
+
+    A fixed pool of `max_concurrency` workers pulls items from `items` as they finish, so only that many coroutines
+    (and e.g. open files) exist at once and `items` can be a lazy generator of any length.
+
+    If map_async is cancelled, or a call raises and return_exceptions is False, the calls still in flight are cancelled
+    and the error is raised.
+
+    Args:
+        function (Callable[[Any], Awaitable[Any]]): Coroutine function called with each item
+        items (Iterable): Items to call `function` with
+        max_concurrency (int, optional): Calls in flight at a time. Defaults to DEFAULT_MAX_CONCURRENCY.
+        ordered (bool, optional): Return results in the order of `items` instead of completion order. Defaults to True.
+        timeout (float | None, optional): Seconds each call may take before it is cancelled with TimeoutError. Defaults to no limit.
+        return_exceptions (bool, optional): Return a call's exception as its result instead of raising it. Defaults to False.
+
+    Returns:
+        list: Result of every call
+    """
+    assert max_concurrency > 0, "ERR: max_concurrency must be positive"
+
+    indexed_items = enumerate(items)
+    completed = []      # (index in items, result)
+
+    async def worker():
+        # Every worker pulls from the same iterator, next() never awaits so no item is taken twice
+        for index, item in indexed_items:
+            try:
+                if timeout is None:
+                    result = await function(item)
+                else:
+                    async with asyncio.timeout(timeout):
+                        result = await function(item)
+
+            except Exception as error:
+                if not return_exceptions: raise
+                result = error
+
+            completed.append((index, result))
+
+    num_workers = min(max_concurrency, len(items)) if hasattr(items, "__len__") else max_concurrency
+    workers = [asyncio.create_task(worker()) for _ in range(num_workers)]
+
+    try:
+        await asyncio.gather(*workers)
+
+    except BaseException:
+        for workerTask in workers: workerTask.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        raise
+
+    if ordered: completed.sort(key=itemgetter(0))
+
+    return [result for _, result in completed]
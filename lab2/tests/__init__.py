@@ -1 +1 @@
-__all__ = ["lab2_test"]
\ No newline at end of file
+__all__ = ["lab2_test", "log_writer_test", "log_scanner_test", "log_store_test", "scheduler_test", "log_rotation_test", "log_follow_test"]
\ No newline at end of file
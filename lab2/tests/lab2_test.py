@@ -25,4 +25,102 @@ async def test_read_logs():
     
     numOccurrences = await read_logs(TEST_LOG_FILE, "ERROR")
     
-    assert numOccurrences == 2, "ERR: Incorrect number of occurrences returned!"
\ No newline at end of file
+    assert numOccurrences == 2, "ERR: Incorrect number of occurrences returned!"
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("keyword", ["ERROR", "E", "ss", "abab", "Disk space is running low."])
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 64, 1 << 20])
+async def test_count_keyword_streaming(tmp_path, keyword, chunk_size):
+    import random
+    
+    randomGenerator = random.Random(chunk_size)
+    content = (Path(__file__).parent / "sample_data/logTest.txt").read_text()
+    content += "".join(randomGenerator.choice(["ab", "abab", "s", "ss", "ERR", "OR", "\n"]) for _ in range(2000))
+    
+    logFilePath = tmp_path / "log.txt"
+    logFilePath.write_text(content)
+    
+    assert await count_keyword_streaming(logFilePath, keyword, chunk_size) == content.count(keyword)
+
+@pytest.mark.asyncio
+async def test_read_logs_wholeFile():
+    TEST_LOG_FILE = Path(__file__).parent / "sample_data/logTest.txt"
+    
+    assert await read_logs(TEST_LOG_FILE, "ERROR", chunk_size=None) == 2
+    assert await read_logs(TEST_LOG_FILE, "ERROR", chunk_size=16) == 2
+
+@pytest.mark.asyncio
+async def test_log_message_writer(tmp_path, monkeypatch):
+    monkeypatch.setattr("lab2.lab2.LOG_FILE_IDLE_TIMEOUT", 0.05)
+    monkeypatch.setattr("lab2.lab2.LOG_FILE_QUEUE_SIZE", 8)
+    
+    await asyncio.gather(*(log_message(tmp_path / f"log{i % 4}.txt", f"INFO: message {i}") for i in range(400)))
+    
+    writer = log_writers[asyncio.get_running_loop()]
+    assert writer._queue.qsize() <= 8
+    
+    await flush_logs()
+    
+    lines = (tmp_path / "log1.txt").read_text().splitlines()
+    assert len(lines) == 100
+    assert lines[0].endswith("] INFO: message 1") and lines[-1].endswith("] INFO: message 397")
+    assert all(writer.is_open(tmp_path / f"log{i}.txt") for i in range(4))
+    
+    # Idle logfiles are closed, the next message reopens its logfile
+    await asyncio.sleep(0.2)
+    assert not any(writer.is_open(tmp_path / f"log{i}.txt") for i in range(4))
+    
+    await log_message(tmp_path / "log1.txt", "ERROR: After idle")
+    await close_logs()
+    assert (tmp_path / "log1.txt").read_text().splitlines()[-1].endswith("] ERROR: After idle")
+    assert asyncio.get_running_loop() not in log_writers
+
+@pytest.mark.asyncio
+async def test_log_message_openError(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        await log_message(tmp_path / "missingFolder" / "log.txt", "INFO: Unwritable")
+    
+    await close_logs()
+
+@pytest.mark.asyncio
+async def test_log_message_writeError(tmp_path, monkeypatch):
+    import errno
+    
+    monkeypatch.setattr("lab2.lab2.LOG_FILE_IDLE_TIMEOUT", 0.05)
+    logFilePath = tmp_path / "log.txt"
+    otherLogFilePath = tmp_path / "other.txt"
+    failures = [OSError(errno.ENOSPC, "No space left on device")]
+    
+    def open_failing(path, *args, **kwargs):
+        if path == logFilePath and failures: raise failures.pop()
+        return open(path, *args, **kwargs)
+    
+    monkeypatch.setattr("lab2.log_writer.open", open_failing, raising=False)
+    
+    await log_message(logFilePath, "INFO: first")
+    await log_message(otherLogFilePath, "INFO: other")
+    await asyncio.sleep(0.2)
+    
+    # The error is kept after every logfile was closed for being idle, and only raised for its logfile
+    assert not log_writers[asyncio.get_running_loop()].is_open(otherLogFilePath)
+    
+    await log_message(otherLogFilePath, "INFO: other again")
+    
+    with pytest.raises(OSError, match="No space left"):
+        await log_message(logFilePath, "INFO: second")
+    
+    # Only raised once, the writer keeps writing
+    await log_message(logFilePath, "INFO: third")
+    await close_logs()
+    
+    assert [line[22:] for line in logFilePath.read_text().splitlines()] == ["INFO: third"]
+    assert len(otherLogFilePath.read_text().splitlines()) == 2
+
+def test_log_message_withoutFlush(tmp_path):
+    async def log_without_flush():
+        for i in range(3000): await log_message(tmp_path / f"log{i % 3}.txt", f"INFO: message {i}")
+    
+    # The event loop stops with messages still queued
+    asyncio.run(log_without_flush())
+    
+    assert [len((tmp_path / f"log{i}.txt").read_text().splitlines()) for i in range(3)] == [1000, 1000, 1000]
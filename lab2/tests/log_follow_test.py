@@ -0,0 +1,79 @@
+import asyncio
+import os
+import pytest
+
+from lab2.log_follow import *
+
+def append(logFilePath, text):
+    with open(logFilePath, "a") as logFile: logFile.write(text)
+
+def test_LogFollower_poll(tmp_path):
+    logFilePath = tmp_path / "log1.txt"
+    append(logFilePath, "ERROR: Before following\n")
+    
+    follower = LogFollower(logFilePath, ["ERROR", "WARNING"])
+    assert follower.poll() == {"ERROR": 0, "WARNING": 0}, "ERR: Lines written before following were counted"
+    
+    append(logFilePath, "ERROR: one\nWARNING: two\nERROR: partial")
+    assert follower.poll() == {"ERROR": 1, "WARNING": 1}
+    
+    append(logFilePath, " line\n")
+    assert follower.poll() == {"ERROR": 1, "WARNING": 0}
+    
+    # Rotated: the rest of the old logfile is read before the new one
+    append(logFilePath, "ERROR: last line of the old logfile")
+    os.replace(logFilePath, tmp_path / "log1.txt.1")
+    append(logFilePath, "WARNING: first line of the new logfile\n")
+    assert follower.poll() == {"ERROR": 1, "WARNING": 1}
+    
+    # Truncated: read again from the start
+    logFilePath.write_text("ERROR: after truncation\n")
+    assert follower.poll() == {"ERROR": 1, "WARNING": 0}
+    
+    assert follower.totals == {"ERROR": 4, "WARNING": 2}
+    follower.close()
+
+def test_LogFollower_state(tmp_path):
+    logFilePath = tmp_path / "log1.txt"
+    
+    follower = LogFollower(logFilePath, ["ERROR"])
+    assert follower.state is None
+    
+    append(logFilePath, "ERROR: one\nERROR: partial")
+    assert follower.poll() == {"ERROR": 1}
+    state = follower.state
+    follower.close()
+    
+    append(logFilePath, " line\nERROR: three\n")
+    
+    resumed = LogFollower(logFilePath, ["ERROR"], state=state)
+    assert resumed.poll() == {"ERROR": 2}, "ERR: Did not resume from the saved offset"
+    resumed.close()
+    
+    assert LogFollower(logFilePath, ["ERROR"], from_start=True).poll() == {"ERROR": 3}
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("use_inotify", [True, False])
+async def test_LogFollower_follow(tmp_path, use_inotify):
+    logFilePath = tmp_path / "log1.txt"
+    logFilePath.touch()
+    
+    follower = LogFollower(logFilePath, ["ERROR"], poll_interval=0.02 if not use_inotify else 5.0, use_inotify=use_inotify)
+    received = []
+    
+    async def consume():
+        async for counts in follower.follow():
+            received.append(counts["ERROR"])
+            if sum(received) >= 3: return
+    
+    consumer = asyncio.create_task(consume())
+    for line in ["ERROR: one\n", "INFO: two\n", "ERROR: three\nERROR: four\n"]:
+        await asyncio.sleep(0.05)
+        append(logFilePath, line)
+    
+    # With inotify the changes are picked up well before the 5s safety poll
+    async with asyncio.timeout(2):
+        await consumer
+    
+    assert sum(received) == 3 and follower.totals == {"ERROR": 3}
+    follower.close()
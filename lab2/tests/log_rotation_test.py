@@ -0,0 +1,100 @@
+import pytest
+
+from lab2.log_rotation import *
+from lab2.log_writer import BufferedLogWriter
+from lab2.lab2 import read_logs, count_keyword_streaming
+
+COMPRESSIONS = [None, "gzip", pytest.param("zstd", marks=pytest.mark.skipif(zstd is None, reason="zstd is not available"))]
+
+@pytest.mark.parametrize("compression", COMPRESSIONS)
+def test_rotate_log_file(tmp_path, compression):
+    logFilePath = tmp_path / "log1.txt"
+    contents = []
+    
+    for rotation in range(3):
+        contents.append(f"[2025-02-03 21:02:4{rotation}] ERROR: rotation {rotation}\n" * 100)
+        logFilePath.write_text(contents[-1])
+        rotatedPath = rotate_log_file(logFilePath, compression)
+        
+        assert not logFilePath.exists()
+        assert rotatedPath.name.endswith(COMPRESSION_SUFFIXES[compression])
+        assert is_compressed(rotatedPath) == (compression is not None)
+    
+    (tmp_path / "log10.txt.20250203-210242-000.gz").touch()      # Segment of another logfile
+    
+    segments = rotated_log_segments(logFilePath)
+    
+    assert len(segments) == 3
+    for segmentPath, content in zip(segments, contents):
+        with open_log_segment(segmentPath) as segmentFile:
+            assert segmentFile.read() == content
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("compression", COMPRESSIONS)
+async def test_read_logs_rotatedSegments(tmp_path, compression):
+    logFilePath = tmp_path / "log1.txt"
+    
+    logFilePath.write_text("ERROR: one\nERROR: two\n")
+    rotate_log_file(logFilePath, compression)
+    logFilePath.write_text("INFO: ERR" + "OR" * 3 + "\nERROR: four\n")
+    
+    compressedSegment = rotated_log_segments(logFilePath)[0]
+    
+    assert await count_keyword_streaming(compressedSegment, "ERROR", chunk_size=3) == 2
+    assert await read_logs(logFilePath, "ERROR") == 4
+    assert await read_logs(logFilePath, "ERROR", chunk_size=None) == 4
+    assert await read_logs(logFilePath, "ERROR", include_rotated=False) == 2
+
+@pytest.mark.asyncio
+async def test_BufferedLogWriter_rotation(tmp_path):
+    logFilePath = tmp_path / "log1.txt"
+    
+    async with BufferedLogWriter(max_batch_size=10, max_bytes=2000) as writer:
+        for i in range(500):
+            await writer.write(logFilePath, f"ERROR: message {i}")
+    
+    segments = rotated_log_segments(logFilePath)
+    
+    assert len(segments) > 5
+    assert all(segmentPath.suffix == ".gz" for segmentPath in segments)
+    assert logFilePath.stat().st_size <= 2000
+    assert await read_logs(logFilePath, "ERROR") == 500
+    
+    async with BufferedLogWriter(max_age=0, compression=None) as writer:
+        await writer.write(logFilePath, "ERROR: Rotates the live logfile on the next batch")
+        await writer.flush()
+        await writer.write(logFilePath, "ERROR: In a new live logfile")
+    
+    assert len(rotated_log_segments(logFilePath)) == len(segments) + 2
+    assert await read_logs(logFilePath, "ERROR") == 502
+
+def test_rotate_log_file_concurrentRead(tmp_path, monkeypatch):
+    import asyncio
+    import shutil
+    
+    copyfileobj = shutil.copyfileobj
+    logFilePath = tmp_path / "log1.txt"
+    logFilePath.write_text("ERROR: one\nERROR: two\n" * 1000)
+    seen_while_compressing = []
+    
+    def copy_and_read(source, destination, length):
+        destination.write(source.read(100))      # Partly written, the rest follows below
+        seen_while_compressing.append(rotated_log_segments(logFilePath))
+        seen_while_compressing.append(asyncio.run(read_logs(logFilePath, "ERROR")))
+        copyfileobj(source, destination, length)
+    
+    monkeypatch.setattr("lab2.log_rotation.shutil.copyfileobj", copy_and_read)
+    compressedPath = rotate_log_file(logFilePath)
+    
+    # Only the complete uncompressed copy is listed while compressing, and the live logfile is missing
+    segments, count = seen_while_compressing
+    assert len(segments) == 1 and not is_compressed(segments[0])
+    assert count == 2000
+    
+    # Both copies exist between the rename and the unlink, the compressed one is listed
+    segments[0].write_text("ERROR: one\nERROR: two\n" * 1000)
+    assert rotated_log_segments(logFilePath) == [compressedPath]
+    assert asyncio.run(read_logs(logFilePath, "ERROR")) == 2000
+    
+    with pytest.raises(FileNotFoundError):
+        asyncio.run(read_logs(tmp_path / "missing.txt", "ERROR"))
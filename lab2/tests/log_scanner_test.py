@@ -0,0 +1,53 @@
+import pytest
+
+from lab2.log_scanner import *
+
+KEYWORDS = ["ERROR", "WARNING", "INFO", "DEBUG"]
+
+def test_count_keywords_in_file():
+    TEST_LOG_FILE = Path(__file__).parent / "sample_data/logTest.txt"
+    content = TEST_LOG_FILE.read_text()
+    
+    counts = count_keywords_in_file(TEST_LOG_FILE, KEYWORDS)
+    
+    assert counts == {keyword: content.count(keyword) for keyword in KEYWORDS}
+    assert counts["ERROR"] == 2
+
+@pytest.mark.parametrize("window_size", [1, 2, 5, 64, DEFAULT_WINDOW_SIZE])
+def test_count_keywords_in_file_windows(tmp_path, window_size):
+    import random
+    
+    randomGenerator = random.Random(window_size)
+    content = "".join(randomGenerator.choice(["ERROR ", "ERR", "ORS", "aa", "a", "abab", "ab", "\n"]) for _ in range(3000))
+    keywords = ["ERR", "ERROR", "aa", "abab", "\n"]
+    
+    logFilePath = tmp_path / "log.txt"
+    logFilePath.write_text(content)
+    
+    assert count_keywords_in_file(logFilePath, keywords, window_size) == {keyword: content.count(keyword) for keyword in keywords}
+
+def test_count_keywords_in_file_empty(tmp_path):
+    logFilePath = tmp_path / "empty.txt"
+    logFilePath.touch()
+    
+    assert count_keywords_in_file(logFilePath, KEYWORDS) == dict.fromkeys(KEYWORDS, 0)
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("max_workers", [1, 2])
+async def test_scan_logs(tmp_path, max_workers):
+    import random
+    
+    randomGenerator = random.Random(max_workers)
+    logFilePaths = []
+    
+    for fileIndex in range(10):
+        logFilePath = tmp_path / f"log{fileIndex}.txt"
+        logFilePath.write_text("".join(f"[2025-02-03 21:02:42] {randomGenerator.choice(KEYWORDS)}: message\n" for _ in range(200)))
+        logFilePaths.append(logFilePath)
+    
+    counts = await scan_logs(logFilePaths, KEYWORDS, max_workers=max_workers, files_per_task=3)
+    
+    assert list(counts) == logFilePaths
+    for logFilePath in logFilePaths:
+        content = logFilePath.read_text()
+        assert counts[logFilePath] == {keyword: content.count(keyword) for keyword in KEYWORDS}
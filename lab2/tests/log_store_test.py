@@ -0,0 +1,140 @@
+import pytest
+
+from lab2.log_store import *
+
+LOG_MESSAGES = [
+    "INFO: Operation completed successfully.",
+    "DEBUG: Variable value at step 5 is 42.",
+    "WARNING: Disk space is running low.",
+    "ERROR: Failed to connect to the database.",
+    "Message without a level",
+]
+
+def fill_store(store, num_records=2000, seed=0):
+    import random
+    from datetime import timedelta
+    
+    randomGenerator = random.Random(seed)
+    timestamp = datetime(2025, 2, 3, 20, 0, 0)
+    records = []
+    
+    for _ in range(num_records):
+        timestamp += timedelta(seconds=randomGenerator.choice([0, 0, 1, 7]))
+        message = randomGenerator.choice(LOG_MESSAGES)
+        store.append(message, timestamp)
+        records.append(LogRecord(timestamp, LEVEL_PATTERN.match(message).group(1) if ":" in message else "", message))
+        
+    return records
+
+def expected_records(records, level, start, end):
+    return [record for record in records if (level is None or record.level == level) and start <= record.timestamp <= end]
+
+@pytest.mark.parametrize("level", [None, "ERROR", "INFO", "", "MISSING"])
+def test_LogStore_query(tmp_path, level):
+    with LogStore(tmp_path, segment_size=4096, index_interval=16) as store:
+        records = fill_store(store)
+        
+        assert len(list(tmp_path.glob("segment-*.log"))) > 5, "ERR: Segments were not rotated"
+        
+        for start, end in [
+            (datetime(2025, 2, 3, 20, 0, 0), datetime(2025, 2, 3, 23, 0, 0)),
+            (datetime(2025, 2, 3, 20, 30, 0), datetime(2025, 2, 3, 20, 45, 0)),
+            (records[500].timestamp, records[500].timestamp),
+            (datetime(2025, 2, 4), datetime(2025, 2, 5)),
+        ]:
+            assert store.query(level, start, end) == expected_records(records, level, start, end)
+        
+        assert store.query(level) == expected_records(records, level, datetime.min, datetime.max)
+
+def test_LogStore_reopenAndReindex(tmp_path):
+    with LogStore(tmp_path, segment_size=4096, index_interval=16) as store:
+        records = fill_store(store, 500)
+    
+    start, end = records[100].timestamp, records[400].timestamp
+    
+    with LogStore(tmp_path, segment_size=4096, index_interval=16) as store:
+        assert store.query("WARNING", start, end) == expected_records(records, "WARNING", start, end)
+        
+        # Appends continue in the last segment and old timestamps are clamped to keep the log in time order
+        store.append("ERROR: After reopen", datetime(2025, 2, 3, 19, 0, 0))
+        assert store.query("ERROR")[-1] == LogRecord(records[-1].timestamp, "ERROR", "ERROR: After reopen")
+    
+    for index_path in tmp_path.glob("*.idx"): index_path.unlink()
+    
+    with LogStore(tmp_path, segment_size=4096, index_interval=16) as store:
+        assert store.query("WARNING", start, end) == expected_records(records, "WARNING", start, end)
+        assert store.query(None, start, end) == expected_records(records, None, start, end)
+
+def test_LogStore_textFormat(tmp_path):
+    with LogStore(tmp_path) as store:
+        store.append("ERROR: Failed to connect to the database.", datetime(2025, 2, 3, 21, 2, 42))
+    
+    assert (tmp_path / "segment-000000.log").read_text() == "[2025-02-03 21:02:42] ERROR: Failed to connect to the database.\n"
+
+def test_LogStore_crashRecovery(tmp_path):
+    with LogStore(tmp_path, index_interval=16) as store:
+        records = fill_store(store, 100)
+    
+    # Records whose index entries were lost in a crash, followed by a partly written record
+    segment_path = tmp_path / "segment-000000.log"
+    lost_records = [LogRecord(datetime(2025, 2, 3, 23, 0, second), "ERROR", f"ERROR: Lost {second}") for second in range(3)]
+    
+    with open(segment_path, "a") as segment_file:
+        for record in lost_records: segment_file.write(f"[{record.timestamp}] {record.message}\n")
+        segment_file.write("[2025-02-03 23:0")
+    
+    with LogStore(tmp_path, index_interval=16) as store:
+        assert store.query("ERROR") == expected_records(records + lost_records, "ERROR", datetime.min, datetime.max)
+        assert store.query(None, lost_records[1].timestamp) == lost_records[1:]
+        
+        # The partly written record is cut off and the last timestamp comes from the re-indexed records
+        store.append("INFO: After recovery", datetime(2025, 2, 3, 22, 0, 0))
+        assert store.query("INFO")[-1] == LogRecord(lost_records[-1].timestamp, "INFO", "INFO: After recovery")
+    
+    assert segment_path.read_text().endswith("ERROR: Lost 2\n[2025-02-03 23:00:02] INFO: After recovery\n")
+    
+    # A partly written index pair makes the segment be re-indexed
+    level_index_path = tmp_path / "segment-000000.level-WARNING.idx"
+    level_index_path.write_bytes(level_index_path.read_bytes()[:-3])
+    
+    with LogStore(tmp_path, index_interval=16) as store:
+        assert store.query("WARNING") == expected_records(records, "WARNING", datetime.min, datetime.max)
+        assert len(store.query()) == len(records) + len(lost_records) + 1
+    
+    assert level_index_path.stat().st_size % 16 == 0
+
+def test_LogStore_killedWithoutClose(tmp_path):
+    import subprocess
+    import sys
+    import textwrap
+    from pathlib import Path
+    from lab2.log_store import _parse_line
+    
+    # Every index file has its own write buffer, so they are flushed to different points when the process dies
+    subprocess.run([sys.executable, "-c", textwrap.dedent(f"""
+        import os
+        from datetime import datetime, timedelta
+        from lab2.log_store import LogStore
+        
+        store = LogStore({str(tmp_path)!r}, index_interval=16)
+        for i in range(700):
+            store.append(("ERROR" if i % 10 == 0 else "INFO") + f": message {{i}}", datetime(2025, 2, 3, 20) + timedelta(seconds=i))
+        os._exit(0)
+    """)], cwd=Path(__file__).parent.parent, check=True)
+    
+    with open(tmp_path / "segment-000000.log", "rb") as segment_file:
+        records = [_parse_line(line) for line in segment_file if line.endswith(b"\n")]
+    
+    assert len(records) > 100
+    
+    with LogStore(tmp_path, index_interval=16) as store:
+        assert store.query("ERROR") == expected_records(records, "ERROR", datetime.min, datetime.max)
+        assert store.query("INFO") == expected_records(records, "INFO", datetime.min, datetime.max)
+        
+        start, end = records[0].timestamp, records[99].timestamp
+        assert store.query(None, start, end) == records[:100]
+        assert store.query("ERROR", start, end) == expected_records(records, "ERROR", start, end)
+        
+        # Appends continue after the last record that made it to disk
+        store.append("ERROR: After the crash", datetime(2025, 2, 3, 19))
+        assert store.query("ERROR")[-1] == LogRecord(records[-1].timestamp, "ERROR", "ERROR: After the crash")
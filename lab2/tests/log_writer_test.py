@@ -0,0 +1,50 @@
+import pytest
+
+from lab2.log_writer import *
+
+@pytest.mark.asyncio
+async def test_BufferedLogWriter_batchesPerFile(tmp_path):
+    writer = BufferedLogWriter(max_batch_size=64)
+    
+    await asyncio.gather(*(writer.write(tmp_path / f"log{i % 3}.txt", f"INFO: message {i}") for i in range(300)))
+    await writer.flush()
+    
+    lines = [(tmp_path / f"log{i}.txt").read_text().splitlines() for i in range(3)]
+    
+    assert [len(fileLines) for fileLines in lines] == [100, 100, 100]
+    assert lines[0][0].endswith("] INFO: message 0")
+    assert lines[0][-1].endswith("] INFO: message 297"), "ERR: Entries were written out of order"
+    
+    await writer.aclose()
+
+@pytest.mark.asyncio
+async def test_BufferedLogWriter_flushInterval(tmp_path):
+    async with BufferedLogWriter(max_batch_size=1000, flush_interval=0.01) as writer:
+        await writer.write(tmp_path / "log.txt", "ERROR: Lone entry")
+        await asyncio.sleep(0.1)
+        
+        # Written by the time threshold even though the batch never filled up
+        assert "ERROR: Lone entry" in (tmp_path / "log.txt").read_text()
+    
+    with pytest.raises(AssertionError):
+        await writer.write(tmp_path / "log.txt", "After close")
+
+@pytest.mark.asyncio
+async def test_BufferedLogWriter_backpressure(tmp_path):
+    async with BufferedLogWriter(max_batch_size=4, max_queue_size=8) as writer:
+        for i in range(100): await writer.write(tmp_path / "log.txt", f"DEBUG: {i}")
+        
+        assert writer._queue.qsize() <= 8
+    
+    assert len((tmp_path / "log.txt").read_text().splitlines()) == 100
+
+@pytest.mark.asyncio
+async def test_BufferedLogWriter_writeErrors(tmp_path):
+    writer = BufferedLogWriter()
+    
+    await writer.write(tmp_path / "missingFolder" / "log.txt", "INFO: Unwritable")
+    
+    with pytest.raises(FileNotFoundError):
+        await writer.flush()
+    
+    await writer.aclose()
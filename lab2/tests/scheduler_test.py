@@ -0,0 +1,62 @@
+import pytest
+
+from lab2.scheduler import *
+
+@pytest.mark.asyncio
+async def test_map_async_boundedAndOrdered():
+    import random
+    
+    randomGenerator = random.Random(0)
+    in_flight, max_in_flight = 0, 0
+    
+    async def work(item):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(randomGenerator.random() / 100)
+        in_flight -= 1
+        return item * 2
+    
+    results = await map_async(work, (item for item in range(200)), max_concurrency=8)
+    
+    assert results == [item * 2 for item in range(200)]
+    assert max_in_flight == 8
+    
+    unordered = await map_async(work, range(50), max_concurrency=8, ordered=False)
+    assert sorted(unordered) == [item * 2 for item in range(50)]
+
+@pytest.mark.asyncio
+async def test_map_async_timeoutsAndExceptions():
+    async def work(item):
+        await asyncio.sleep(item)
+        if item == 0.02: raise ValueError(item)
+        return item
+    
+    results = await map_async(work, [0, 0.02, 1, 0.01], timeout=0.1, return_exceptions=True)
+    
+    assert results[0] == 0 and results[3] == 0.01
+    assert isinstance(results[1], ValueError)
+    assert isinstance(results[2], TimeoutError)
+    
+    with pytest.raises(ValueError):
+        await map_async(work, [0.02, 1, 1], max_concurrency=3)
+
+@pytest.mark.asyncio
+async def test_map_async_cancellation():
+    cancelled = []
+    
+    async def work(item):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(item)
+            raise
+    
+    mapTask = asyncio.create_task(map_async(work, range(100), max_concurrency=4))
+    await asyncio.sleep(0.01)
+    mapTask.cancel()
+    
+    with pytest.raises(asyncio.CancelledError):
+        await mapTask
+    
+    assert sorted(cancelled) == [0, 1, 2, 3], "ERR: Only the calls in flight should have been started and cancelled"
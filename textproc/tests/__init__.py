@@ -1 +1 @@
-__all__ = ["lab1_test", "lab1_part2_test"]
\ No newline at end of file
+__all__ = ["lab1_test", "lab1_part2_test", "benchmark_test", "concurrent_cache_test", "cache_policies_test", "cache_stats_test", "shared_cache_test", "memoize_test"]
\ No newline at end of file
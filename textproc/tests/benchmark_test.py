@@ -0,0 +1,50 @@
+import pytest
+
+from textproc.benchmark import *
+
+def test_parseSize():
+    assert parseSize("1MB") == 1 << 20
+    assert parseSize("100MB") == 100 << 20
+    assert parseSize("1GB") == 1 << 30
+    
+    with pytest.raises(AssertionError):
+        parseSize("1TB")
+
+def test_generateCorpus(tmp_path):
+    pathToTxtFile = tmp_path / "corpus.txt"
+    generateCorpus(pathToTxtFile, 64 * 1024, vocabularySize=100)
+    
+    assert pathToTxtFile.stat().st_size >= 64 * 1024
+    assert len(WordOccurrences(pathToTxtFile).wordOccurrenceDict) <= 100
+    
+    copyPathToTxtFile = tmp_path / "copy.txt"
+    generateCorpus(copyPathToTxtFile, 64 * 1024, vocabularySize=100)
+    assert copyPathToTxtFile.read_bytes() == pathToTxtFile.read_bytes(), "ERR: Corpus generation is not reproducible"
+
+@pytest.mark.parametrize("accessPattern", ACCESS_PATTERNS)
+def test_generateKeys(accessPattern):
+    keys = generateKeys(accessPattern, 1000, 50)
+    
+    assert len(keys) == 1000
+    
+    if accessPattern == "zipfianWithScans":
+        assert any(key >= 50 for key in keys), "ERR: Expected scans over keys outside the key space"
+        assert len(set(key for key in keys if key >= 50)) == sum(1 for key in keys if key >= 50), "ERR: Scanned keys should never repeat"
+    else:
+        assert all(0 <= key < 50 for key in keys)
+
+def test_runBenchmarks(tmp_path):
+    benchmarkResults = runBenchmarks(["16KB"], tmp_path, repeats=1, cacheCapacity=10, cacheKeySpace=100, cacheOperations=500,
+                                     constructorNames=["WordOccurrences.fromFileStream"])
+    
+    json.dumps(benchmarkResults)
+    benchmarkNames = [result["benchmark"] for result in benchmarkResults["results"]]
+    
+    assert "WordOccurrences.fromFileStream" in benchmarkNames
+    assert "WordOccurrences.fromFileStream.printTopKOccurrences" in benchmarkNames
+    assert benchmarkNames.count("LRUCache.get") == len(ACCESS_PATTERNS)
+    assert all(f"LRUCache.stats.{variant}" in benchmarkNames for variant in CACHE_STATS_VARIANTS)
+    
+    for result in benchmarkResults["results"]:
+        assert result["opsPerSecond"] is None or result["opsPerSecond"] > 0
+        assert result["p50Seconds"] is None or result["p50Seconds"] <= result["p99Seconds"]
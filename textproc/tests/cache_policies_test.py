@@ -0,0 +1,81 @@
+import pytest
+
+from textproc.cache_policies import *
+from tests.lab1_part2_test import replayRandomOperations
+
+@pytest.mark.parametrize("capacity", [1, 2, 10])
+def test_LRUPolicy_matchesLRUCache(capacity):
+    for seed in range(3):
+        results, referenceResults = replayRandomOperations(PolicyCache(capacity, LRUPolicy), capacity, seed)
+        
+        assert results == referenceResults, f"ERR: PolicyCache({capacity}, LRUPolicy) diverged from LRUCache with seed {seed}"
+
+@pytest.mark.parametrize("policyName", list(EVICTION_POLICIES))
+@pytest.mark.parametrize("capacity", [1, 2, 10, 100])
+def test_policies_capacityAndValues(policyName, capacity):
+    import random
+    
+    randomGenerator = random.Random(capacity)
+    cache = PolicyCache(capacity, EVICTION_POLICIES[policyName])
+    
+    for _ in range(5000):
+        key = randomGenerator.randrange(capacity * 4)
+        value = cache.get(key)
+        
+        assert value == -1 or value == key * 10, f"ERR: {policyName} returned {value} for key {key}"
+        if value == -1: cache.put(key, key * 10)
+        
+        assert len(cache) <= capacity, f"ERR: {policyName} holds more than {capacity} entries"
+
+@pytest.mark.parametrize("policyName", list(EVICTION_POLICIES))
+def test_policies_updateKeepsNewestValue(policyName):
+    cache = PolicyCache(2, EVICTION_POLICIES[policyName])
+    
+    cache.put(1, 1)
+    cache.put(1, 2)
+    
+    assert cache.get(1) == 2
+    assert len(cache) == 1
+
+@pytest.mark.parametrize("policyName", ["2Q", "ARC", "W-TinyLFU"])
+def test_policies_scanResistance(policyName):
+    import itertools
+    
+    capacity = 100
+    hotKeys = range(50)
+    
+    def hotKeysKeptAfterScan(policyFactory):
+        cache = PolicyCache(capacity, policyFactory)
+        
+        # Hot keys mixed with one-off keys, so the cache is under eviction pressure while it learns the hot keys
+        for warmUpPass in range(20):
+            for key in itertools.chain(hotKeys, range(10_000 + warmUpPass * 30, 10_000 + (warmUpPass + 1) * 30)):
+                if cache.get(key) == -1: cache.put(key, key)
+        
+        for key in range(1000, 1000 + 10 * capacity):   # One-off scan, e.g. a bulk job listing
+            if cache.get(key) == -1: cache.put(key, key)
+        
+        return sum(cache.get(key) != -1 for key in hotKeys)
+    
+    assert hotKeysKeptAfterScan(LRUPolicy) == 0, "ERR: Expected the scan to flush a plain LRU"
+    assert hotKeysKeptAfterScan(EVICTION_POLICIES[policyName]) >= len(hotKeys) // 2, f"ERR: {policyName} was flushed by a scan"
+
+def test_CountMinSketch():
+    sketch = CountMinSketch(width=64, sampleSize=10_000)
+    
+    for _ in range(10): sketch.increment("hot")
+    sketch.increment("cold")
+    
+    assert sketch.estimate("hot") >= 10
+    assert sketch.estimate("hot") > sketch.estimate("cold") >= 1
+    assert sketch.estimate("never seen") <= sketch.estimate("cold")
+    
+    for _ in range(100): sketch.increment("hot")
+    assert sketch.estimate("hot") == 15, "ERR: Counters should saturate"
+
+def test_EvictionPolicy_isAbstract():
+    class IncompletePolicy(EvictionPolicy):
+        def onGet(self, key, hit:bool): pass
+    
+    with pytest.raises(TypeError):
+        PolicyCache(10, IncompletePolicy)
@@ -0,0 +1,129 @@
+import pytest
+
+from textproc.cache_stats import *
+from textproc.lab1_part2 import LRUCache, OrderedLRUCache, CompactLRUCache, ExpiringLRUCache
+from textproc.concurrent_cache import ConcurrentLRUCache
+from textproc.cache_policies import PolicyCache
+from textproc.shared_cache import SharedLRUCache
+
+@pytest.mark.parametrize("cacheFactory", [LRUCache, OrderedLRUCache, CompactLRUCache, ExpiringLRUCache, PolicyCache, lambda capacity: ConcurrentLRUCache(capacity, numSegments=1)])
+def test_InstrumentedCache_counters(cacheFactory):
+    cache = InstrumentedCache(cacheFactory(2), sampleEvery=1)
+
+    cache.put(1, 1)
+    cache.put(2, 2)
+    assert cache.get(1) == 1            # hit
+    cache.put(3, 3)                     # LRU key was 2, evicts key 2
+    assert cache.get(2) == -1           # miss
+    cache.put(3, 30)                    # replace
+
+    stats = cache.stats()
+
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hitRatio"] == 0.5
+    assert stats["inserts"] == 3
+    assert stats["evictions"] == 1
+    assert stats["replaces"] == 1
+    assert stats["size"] == 2
+    assert stats["getLatency"]["count"] == 2
+    assert stats["putLatency"]["count"] == 4
+    assert stats["getLatency"]["buckets"][-1] == (float("inf"), 2)
+
+@pytest.mark.parametrize("cacheFactory", [LRUCache, OrderedLRUCache, CompactLRUCache, lambda capacity: ConcurrentLRUCache(capacity, numSegments=1)])
+def test_InstrumentedCache_batchCounters(cacheFactory):
+    engine = cacheFactory(3)
+    cache = InstrumentedCache(engine, sampleEvery=None)
+
+    # Without sampling the engine's own methods are used, the engine counts the calls itself
+    assert cache.get == engine.get and cache.put == engine.put
+
+    engine.put_many([(1, 1), (2, 2), (1, 10), (3, 3), (4, 4), (5, 5)])
+    assert engine.get_many([1, 2, 3, 4, 5]) == [-1, -1, 3, 4, 5]
+
+    stats = cache.stats()
+    assert (stats["inserts"], stats["replaces"], stats["evictions"]) == (5, 1, 2)
+    assert (stats["hits"], stats["misses"], stats["size"]) == (3, 2, 3)
+
+    cache.resetStats()
+    assert cache.stats()["inserts"] == 0 and cache.stats()["size"] == 3
+
+@pytest.mark.parametrize("cacheFactory", [LRUCache, OrderedLRUCache, CompactLRUCache, ExpiringLRUCache, PolicyCache])
+def test_InstrumentedCache_countingClass(cacheFactory):
+    engine = cacheFactory(2)
+    engine.put(1, 1)
+    engineGet = type(engine).get
+
+    cache = InstrumentedCache(engine)
+
+    # Counting is swapped in for this engine only, other engines keep running the uncounted get / put
+    assert isinstance(engine, cacheFactory) and type(engine).get is not engineGet
+    assert type(cacheFactory(2)).get is engineGet
+    assert cache.get == engine.get and cache.put == engine.put, "ERR: Latency sampling should be opt-in"
+
+    assert engine.get(1) == 1 and engine.get(2) == -1
+    assert (cache.stats()["hits"], cache.stats()["misses"], cache.stats()["size"]) == (1, 1, 1)
+
+def test_InstrumentedCache_expiryAndSharedCache():
+    now = [0.0]
+    cache = InstrumentedCache(ExpiringLRUCache(10, ttl=5, clock=lambda: now[0]), sampleEvery=None)
+    cache.put(1, 1)
+    cache.put(2, 2)
+    now[0] = 6
+    assert cache.get(1) == -1           # Expired on read
+    assert cache.cache.expire() == 1    # Expired by the sweep
+    assert (cache.stats()["misses"], cache.stats()["evictions"]) == (1, 2)
+    cache.put(3, 3)
+    now[0] = 20
+    cache.put(4, 4)                     # Expires key 3 in the sweep put runs, counted once
+    assert (cache.stats()["inserts"], cache.stats()["evictions"], cache.stats()["size"]) == (4, 3, 1)
+
+    with SharedLRUCache(1, keySize=4, valueSize=4) as sharedCache:
+        cache = InstrumentedCache(sharedCache, sampleEvery=None)
+        cache.put(b"a", b"1")
+        cache.put(b"a", b"2")
+        cache.put(b"b", b"3")
+        assert cache.get(b"a") == -1 and cache.get(b"b") == b"3"
+        assert {name: cache.stats()[name] for name in ("hits", "misses", "inserts", "replaces", "evictions")} == {"hits": 1, "misses": 1, "inserts": 2, "replaces": 1, "evictions": 1}
+
+def test_InstrumentedCache_sampling():
+    cache = InstrumentedCache(OrderedLRUCache(10), sampleEvery=10)
+
+    for key in range(100): cache.get(key)
+
+    assert cache.stats()["misses"] == 100
+    assert cache.stats()["getLatency"]["count"] == 10
+
+    cache.resetStats()
+    assert cache.stats()["misses"] == 0
+    assert cache.stats()["hitRatio"] is None
+
+def test_LatencyHistogram():
+    histogram = LatencyHistogram()
+
+    for nanoseconds in (1, 128, 129, 1000, 10**12):
+        histogram.record(nanoseconds)
+
+    buckets = histogram.snapshot()["buckets"]
+
+    assert buckets[0] == (128 / 1e9, 2)           # 1ns and 128ns
+    assert buckets[1] == (256 / 1e9, 3)           # 129ns
+    assert buckets[-2][1] == 4                    # Everything but the 1000s outlier
+    assert buckets[-1] == (float("inf"), 5)
+    assert histogram.snapshot()["sumSeconds"] == pytest.approx((1 + 128 + 129 + 1000 + 10**12) / 1e9)
+
+def test_exportPrometheus():
+    cache = InstrumentedCache(OrderedLRUCache(1), name="jobs", sampleEvery=1)
+    cache.put(1, 1)
+    cache.put(2, 2)
+    cache.get(2)
+
+    exported = cache.exportPrometheus()
+
+    assert 'textproc_cache_hits_total{cache="jobs"} 1' in exported
+    assert 'textproc_cache_evictions_total{cache="jobs"} 1' in exported
+    assert 'textproc_cache_size{cache="jobs"} 1' in exported
+    assert "# TYPE textproc_cache_get_latency_seconds histogram" in exported
+    assert 'textproc_cache_get_latency_seconds_bucket{cache="jobs",le="+Inf"} 1' in exported
+    assert 'textproc_cache_put_latency_seconds_count{cache="jobs"} 2' in exported
+    assert exported.endswith("\n")
@@ -0,0 +1,83 @@
+import pytest
+
+from textproc.concurrent_cache import *
+from textproc.lab1_part2 import CompactLRUCache
+
+@pytest.mark.parametrize("cacheFactory", [OrderedLRUCache, CompactLRUCache])
+def test_ConcurrentLRUCache_singleThread(cacheFactory):
+    cache = ConcurrentLRUCache(100, numSegments=4, cacheFactory=cacheFactory)
+
+    for key in range(100): cache.put(key, key * 2)
+
+    assert len(cache) == 100
+    assert all(cache.get(key) == key * 2 for key in range(100))
+    assert cache.get(100) == -1
+
+    for key in range(100, 1000): cache.put(key, key)
+
+    assert len(cache) == 100, "ERR: Segments together exceed the capacity"
+
+def test_ConcurrentLRUCache_capacitySmallerThanSegments():
+    cache = ConcurrentLRUCache(3, numSegments=16)
+
+    for key in range(10): cache.put(key, key)
+
+    assert len(cache) <= 3
+
+def test_ConcurrentLRUCache_threads():
+    import random, threading
+
+    cache = ConcurrentLRUCache(500, numSegments=8)
+    errors = []
+
+    def worker(seed):
+        randomGenerator = random.Random(seed)
+        try:
+            for _ in range(20_000):
+                key = randomGenerator.randrange(2000)
+                if randomGenerator.random() < 0.8:
+                    value = cache.get(key)
+                    assert value == -1 or value == key, f"ERR: Got value {value} for key {key}"
+                else:
+                    cache.put(key, key)
+        except Exception as error:
+            errors.append(error)
+
+    threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(8)]
+    for thread in threads: thread.start()
+    for thread in threads: thread.join()
+
+    assert errors == []
+    assert len(cache) <= 500
+
+def test_AsyncLRUCache():
+    import asyncio
+
+    async def run():
+        cache = AsyncLRUCache(2, numSegments=1)
+
+        await cache.put(1, 1)
+        await cache.put(2, 2)
+        assert await cache.get(1) == 1
+
+        await cache.put(3, 3)               # LRU key was 2, evicts key 2
+        assert await cache.get(2) == -1
+
+        results = await asyncio.gather(*(cache.get(key) for key in (1, 3)))
+        assert results == [1, 3]
+
+    asyncio.run(run())
+
+def test_ConcurrentLRUCache_batchOperations():
+    import asyncio
+    
+    cache = ConcurrentLRUCache(100, numSegments=4)
+    
+    cache.put_many((key, key * 2) for key in range(50))
+    cache.put_many({50: 100, 51: 102})
+    
+    assert cache.get_many([51, 0, 1000, 25]) == [102, 0, -1, 50]
+    assert len(cache) == 52
+    
+    asyncCache = AsyncLRUCache(10, cache=cache)
+    assert asyncio.run(asyncCache.get_many([1, 2000])) == [2, -1]
@@ -254,4 +254,153 @@ def test7_LRUCache(LRUCache_Size1, LRUCache_Size2, LRUCache_Size10, capsys):
     cache.put(9,26)
     cache.put(13,28)
     cache.put(11,26)
+
+
+def replayRandomOperations(cache, capacity, seed, numOperations=2000, keySpace=None):
+    """
+    Runs the same random get / put sequence on `cache` and on a reference LRUCache and returns both get results.
+    """
+    import random
+    
+    randomGenerator = random.Random(seed)
+    referenceCache = LRUCache(capacity)
+    keySpace = keySpace or capacity * 3
+    results, referenceResults = [], []
+    
+    for _ in range(numOperations):
+        key = randomGenerator.randrange(keySpace)
+        
+        if randomGenerator.random() < 0.5:
+            results.append(cache.get(key))
+            referenceResults.append(referenceCache.get(key))
+        else:
+            value = randomGenerator.randrange(100)
+            cache.put(key, value)
+            referenceCache.put(key, value)
+            
+    return results, referenceResults
+
+@pytest.mark.parametrize("capacity", [1, 2, 10, 100])
+def test_OrderedLRUCache_matchesLRUCache(capacity):
+    for seed in range(3):
+        results, referenceResults = replayRandomOperations(OrderedLRUCache(capacity), capacity, seed)
+        
+        assert results == referenceResults, f"ERR: OrderedLRUCache({capacity}) diverged from LRUCache with seed {seed}"
+
+def test_OrderedLRUCache_hotKeys():
+    cache = OrderedLRUCache(2)
+    
+    cache.put(1, 1)
+    cache.put(2, 2)
+    for _ in range(10_000): cache.get(1) # Hot key refreshed many times
+    
+    cache.put(3, 3)                      # LRU key was 2, evicts key 2
+    assert cache.get(2) == -1
+    assert cache.get(1) == 1
+    assert cache.get(3) == 3
+
+@pytest.mark.parametrize("capacity", [1, 2, 10, 100])
+@pytest.mark.parametrize("typecode", [None, "q"])
+def test_CompactLRUCache_matchesLRUCache(capacity, typecode):
+    for seed in range(3):
+        results, referenceResults = replayRandomOperations(CompactLRUCache(capacity, typecode, typecode), capacity, seed)
+        
+        assert results == referenceResults, f"ERR: CompactLRUCache({capacity}, {typecode}) diverged from LRUCache with seed {seed}"
+
+def test_CompactLRUCache_memory():
+    import tracemalloc
+    
+    def measureEntryMemory(cacheFactory):
+        tracemalloc.start()
+        cache = cacheFactory(20_000)
+        for key in range(1_000_000, 1_020_000): cache.put(key, key)
+        allocatedBytes, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        
+        assert cache.get(1_000_000) == 1_000_000
+        return allocatedBytes
+    
+    assert measureEntryMemory(lambda capacity: CompactLRUCache(capacity, "q", "q")) * 3 < measureEntryMemory(LRUCache) * 2
+
+@pytest.mark.parametrize("capacity", [1, 2, 10])
+def test_ExpiringLRUCache_matchesLRUCache(capacity):
+    for seed in range(3):
+        results, referenceResults = replayRandomOperations(ExpiringLRUCache(capacity), capacity, seed)
+        
+        assert results == referenceResults, f"ERR: ExpiringLRUCache({capacity}) diverged from LRUCache with seed {seed}"
+
+class FakeClock(object):
+    def __init__(self): self.now = 0.0
+    def __call__(self): return self.now
+
+def test_ExpiringLRUCache_ttl():
+    clock = FakeClock()
+    cache = ExpiringLRUCache(10, ttl=5, expiryInterval=1, clock=clock)
+    
+    cache.put(1, 1)
+    cache.put(2, 2, ttl=20)
+    cache.put(3, 3)
+    
+    clock.now = 4
+    assert cache.get(1) == 1
+    cache.put(3, 30)                    # Replacing an entry restarts its ttl
+    
+    clock.now = 6
+    assert cache.get(1) == -1           # Lazy expiry on read
+    assert len(cache) == 2
+    
+    clock.now = 10
+    assert cache.expire() == 1          # Entry 3 expired at 9
+    assert len(cache) == 1
+    assert cache.get(2) == 2
+    
+    clock.now = 21
+    cache.put(4, 4)                     # Periodic expiry during put drops entry 2
+    assert len(cache) == 1
+    assert cache.get(2) == -1
+
+def test_ExpiringLRUCache_weigher():
+    cache = ExpiringLRUCache(100, weigher=lambda key, value: len(value))
     
+    cache.put("a", "x" * 40)
+    cache.put("b", "x" * 40)
+    assert cache.weight == 80
+    
+    cache.get("a")
+    cache.put("c", "x" * 30)            # LRU key was b, evicts b to fit c
+    assert cache.get("b") == -1
+    assert cache.weight == 70
+    
+    cache.put("huge", "x" * 101)        # Larger than the whole budget, never cached
+    assert cache.get("huge") == -1
+    assert cache.get("a") == "x" * 40
+    
+    cache.put("d", "x" * 100)           # Evicts everything else
+    assert len(cache) == 1
+    assert cache.weight == 100
+
+@pytest.mark.parametrize("cacheFactory", [LRUCache, OrderedLRUCache, CompactLRUCache])
+@pytest.mark.parametrize("capacity", [1, 3, 50])
+def test_batchOperations_matchSingleOperations(cacheFactory, capacity):
+    import random
+    
+    randomGenerator = random.Random(capacity)
+    cache, referenceCache = cacheFactory(capacity), OrderedLRUCache(capacity)
+    
+    for _ in range(300):
+        keys = [randomGenerator.randrange(capacity * 3) for _ in range(randomGenerator.randrange(1, capacity * 2 + 2))]
+        operation = randomGenerator.random()
+        
+        if operation < 0.4:
+            assert cache.get_many(keys) == [referenceCache.get(key) for key in keys]
+        elif operation < 0.8:
+            items = [(key, randomGenerator.randrange(100)) for key in keys]
+            cache.put_many(items if operation < 0.6 else dict(items))
+            for key, value in (items if operation < 0.6 else dict(items).items()): referenceCache.put(key, value)
+        else:
+            # Single operations in between batches must still see a consistent recency order
+            assert cache.get(keys[0]) == referenceCache.get(keys[0])
+            cache.put(keys[-1], 1)
+            referenceCache.put(keys[-1], 1)
+        
+        assert len(cache) == len(referenceCache)
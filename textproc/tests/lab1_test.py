@@ -4,14 +4,14 @@ from textproc.lab1 import *
 
 @pytest.fixture
 def wordOccurrences_Sample1():
-    textfilePath = os.path.join(__file__, "..\\sample_data\\Sample1.txt")
+    textfilePath = os.path.join(os.path.dirname(__file__), "sample_data", "Sample1.txt")
     wordOccurrences = WordOccurrences(textfilePath)
     
     return wordOccurrences
 
 @pytest.fixture
 def wordOccurrences_Sample2():
-    textfilePath = os.path.join(__file__, "..\\sample_data\\Sample2.txt")
+    textfilePath = os.path.join(os.path.dirname(__file__), "sample_data", "Sample2.txt")
     wordOccurrences = WordOccurrences(textfilePath)
     
     return wordOccurrences
@@ -50,4 +50,196 @@ def test_largestOccurrenceIndex(wordOccurrences_Sample1, wordOccurrences_Sample2
     assert mostOccurringWords == "This"
     
     with pytest.raises(Exception):
-        wordOccurrences_Sample1.occurrenceWordDict[wordOccurrences_Sample1.largestOccurrenceIndex + 1] # largestOccurrenceIndex should be the most occurring word index
\ No newline at end of file
+        wordOccurrences_Sample1.occurrenceWordDict[wordOccurrences_Sample1.largestOccurrenceIndex + 1] # largestOccurrenceIndex should be the most occurring word index
+
+@pytest.mark.parametrize("sampleFileName", ["Sample1.txt", "Sample2.txt"])
+@pytest.mark.parametrize("chunkSize", [1, 7, 4096, DEFAULT_CHUNK_SIZE])
+def test_fromFileStream(sampleFileName, chunkSize):
+    textfilePath = os.path.join(os.path.dirname(__file__), "sample_data", sampleFileName)
+    wordOccurrences = WordOccurrences(textfilePath)
+    streamedWordOccurrences = WordOccurrences.fromFileStream(textfilePath, chunkSize)
+    
+    assert streamedWordOccurrences.wordOccurrenceDict == wordOccurrences.wordOccurrenceDict
+    assert streamedWordOccurrences.occurrenceWordDict == wordOccurrences.occurrenceWordDict
+    assert streamedWordOccurrences.largestOccurrenceIndex == wordOccurrences.largestOccurrenceIndex
+
+def test_fromFileStream_wordSplitAcrossChunks(tmp_path):
+    textfilePath = tmp_path / "split.txt"
+    textfilePath.write_text("alpha beta, al-pha\nbeta\talpha")
+    
+    wordOccurrences = WordOccurrences.fromFileStream(textfilePath, chunkSize=3)
+    
+    assert wordOccurrences.wordOccurrenceDict == {"alpha": 3, "beta": 2}
+    assert wordOccurrences.largestOccurrenceIndex == 3
+
+
+@pytest.mark.parametrize("sampleFileName", ["Sample1.txt", "Sample2.txt"])
+@pytest.mark.parametrize("numWorkers", [1, 2, 5])
+def test_fromFileParallel(sampleFileName, numWorkers):
+    textfilePath = os.path.join(os.path.dirname(__file__), "sample_data", sampleFileName)
+    wordOccurrences = WordOccurrences(textfilePath)
+    parallelWordOccurrences = WordOccurrences.fromFileParallel(textfilePath, numWorkers, chunkSize=64)
+    
+    assert parallelWordOccurrences.wordOccurrenceDict == wordOccurrences.wordOccurrenceDict
+    assert parallelWordOccurrences.occurrenceWordDict == wordOccurrences.occurrenceWordDict
+    assert parallelWordOccurrences.largestOccurrenceIndex == wordOccurrences.largestOccurrenceIndex
+
+def test_fromFileParallel_moreWorkersThanWords(tmp_path):
+    textfilePath = tmp_path / "short.txt"
+    textfilePath.write_text("caf\u00e9 caf\u00e9 na\u00efve", encoding="utf-8")
+    
+    wordOccurrences = WordOccurrences.fromFileParallel(textfilePath, numWorkers=16, chunkSize=1)
+    
+    assert wordOccurrences.wordOccurrenceDict == {"caf\u00e9": 2, "na\u00efve": 1}
+
+
+def test_topK(wordOccurrences_Sample1):
+    includedTopK = wordOccurrences_Sample1.topK(5)
+    assert [numberOfOccurrences for numberOfOccurrences, _ in includedTopK] == list(range(wordOccurrences_Sample1.largestOccurrenceIndex, wordOccurrences_Sample1.largestOccurrenceIndex - 5, -1))
+    assert includedTopK[0] == (wordOccurrences_Sample1.largestOccurrenceIndex, ["the"])
+    
+    skippedTopK = wordOccurrences_Sample1.topK(5, wordOccurrences_Sample1.Options.SKIP_NO_OCCURRENCES)
+    assert len(skippedTopK) == 5
+    assert all(words for _, words in skippedTopK), "SKIP_NO_OCCURRENCES returned an empty occurrence"
+    assert [numberOfOccurrences for numberOfOccurrences, _ in skippedTopK] == sorted(wordOccurrences_Sample1.occurrenceWordDict, reverse=True)[:5]
+    
+    assert len(wordOccurrences_Sample1.topK(10**6)) == wordOccurrences_Sample1.largestOccurrenceIndex
+
+def test_topK_skewedOccurrences(capsys):
+    wordOccurrences = WordOccurrences._fromWordOccurrenceDict({"common": 10**9, "rare": 1, "seldom": 1})
+    
+    assert wordOccurrences.topK(5, wordOccurrences.Options.SKIP_NO_OCCURRENCES) == [(10**9, ["common"]), (1, ["rare", "seldom"])]
+    
+    wordOccurrences.printTopKOccurrences(5, wordOccurrences.Options.SKIP_NO_OCCURRENCES)
+    captured = capsys.readouterr()
+    assert captured.out == f"{'=' * 70}\n{10**9} Occurrences:\ncommon\n{'-' * 70}\n1 Occurrences:\nrare, seldom\n{'=' * 70}\n\n"
+
+
+def test_getWordsWithOccurrences(wordOccurrences_Sample1):
+    assert wordOccurrences_Sample1.getWordsWithOccurrences(wordOccurrences_Sample1.largestOccurrenceIndex) == ["the"]
+    assert wordOccurrences_Sample1.getWordsWithOccurrences(wordOccurrences_Sample1.largestOccurrenceIndex + 1) == []
+    
+    wordsWithOneOccurrence = wordOccurrences_Sample1.getWordsWithOccurrences(1)
+    assert wordsWithOneOccurrence == [word for word, numberOfOccurrences in wordOccurrences_Sample1.wordOccurrenceDict.items() if numberOfOccurrences == 1]
+    assert wordOccurrences_Sample1.occurrenceWordDict[1] == ", ".join(wordsWithOneOccurrence)
+    
+    for numberOfOccurrences in wordOccurrences_Sample1.occurrenceWordDict:
+        for word in wordOccurrences_Sample1.getWordsWithOccurrences(numberOfOccurrences):
+            assert wordOccurrences_Sample1.wordOccurrenceDict[word] == numberOfOccurrences
+
+
+def test_add_text_remove_text():
+    wordOccurrences = WordOccurrences._fromWordOccurrenceDict({"alpha": 2, "beta": 1})
+    
+    wordOccurrences.add_text("beta, gamma beta")
+    assert wordOccurrences.wordOccurrenceDict == {"alpha": 2, "beta": 3, "gamma": 1}
+    assert wordOccurrences.largestOccurrenceIndex == 3
+    assert wordOccurrences.getWordsWithOccurrences(3) == ["beta"]
+    assert wordOccurrences.getWordsWithOccurrences(1) == ["gamma"]
+    
+    wordOccurrences.remove_text("beta beta gamma")
+    assert wordOccurrences.wordOccurrenceDict == {"alpha": 2, "beta": 1}
+    assert wordOccurrences.largestOccurrenceIndex == 2
+    assert dict(wordOccurrences.occurrenceWordDict) == {2: "alpha", 1: "beta"}
+    
+    with pytest.raises(AssertionError):
+        wordOccurrences.remove_text("alpha beta beta")
+    assert wordOccurrences.wordOccurrenceDict == {"alpha": 2, "beta": 1}, "A rejected remove_text must not change the occurrences"
+    
+    wordOccurrences.remove_text("alpha alpha beta")
+    assert wordOccurrences.wordOccurrenceDict == {}
+    assert wordOccurrences.largestOccurrenceIndex == 0
+    assert len(wordOccurrences.occurrenceWordDict) == 0
+
+def test_add_file(wordOccurrences_Sample1, wordOccurrences_Sample2):
+    sampleDataFolder = os.path.join(os.path.dirname(__file__), "sample_data")
+    
+    wordOccurrences_Sample1.add_file(os.path.join(sampleDataFolder, "Sample2.txt"), chunkSize=16)
+    expectedWordOccurrences = WordOccurrences._fromWordOccurrenceDict(collections.Counter(WordOccurrences(os.path.join(sampleDataFolder, "Sample1.txt")).wordOccurrenceDict) + collections.Counter(wordOccurrences_Sample2.wordOccurrenceDict))
+    
+    assert wordOccurrences_Sample1.wordOccurrenceDict == expectedWordOccurrences.wordOccurrenceDict
+    assert wordOccurrences_Sample1.largestOccurrenceIndex == expectedWordOccurrences.largestOccurrenceIndex
+    
+    sortedTopK = lambda wordOccurrences: [(numberOfOccurrences, sorted(words)) for numberOfOccurrences, words in wordOccurrences.topK(20)]
+    assert sortedTopK(wordOccurrences_Sample1) == sortedTopK(expectedWordOccurrences)
+
+
+def test_save_load(wordOccurrences_Sample2, tmp_path):
+    pathToIndexFile = tmp_path / "Sample2.idx"
+    wordOccurrences_Sample2.add_text("na\u00efve caf\u00e9 caf\u00e9")
+    wordOccurrences_Sample2.save(pathToIndexFile)
+    
+    loadedWordOccurrences = WordOccurrences.load(pathToIndexFile)
+    
+    assert loadedWordOccurrences.wordOccurrenceDict == wordOccurrences_Sample2.wordOccurrenceDict
+    assert list(loadedWordOccurrences.wordOccurrenceDict) == sorted(wordOccurrences_Sample2.wordOccurrenceDict)
+    assert loadedWordOccurrences.wordOccurrenceDict["caf\u00e9"] == wordOccurrences_Sample2.wordOccurrenceDict["caf\u00e9"]
+    assert "missingWord" not in loadedWordOccurrences.wordOccurrenceDict
+    assert loadedWordOccurrences.largestOccurrenceIndex == wordOccurrences_Sample2.largestOccurrenceIndex
+    assert loadedWordOccurrences.occurrenceWordDict == wordOccurrences_Sample2.occurrenceWordDict
+    
+    # Words keep their order within each number of occurrences
+    for options in WordOccurrences.Options:
+        assert loadedWordOccurrences.topK(20, options) == wordOccurrences_Sample2.topK(20, options)
+    assert loadedWordOccurrences.getWordsWithOccurrences(1) == wordOccurrences_Sample2.getWordsWithOccurrences(1)
+    assert loadedWordOccurrences.getWordsWithOccurrences(10**9) == []
+    
+    loadedWordOccurrences.add_text("This")
+    assert loadedWordOccurrences.wordOccurrenceDict["This"] == wordOccurrences_Sample2.wordOccurrenceDict["This"] + 1
+    assert loadedWordOccurrences.getWordsWithOccurrences(wordOccurrences_Sample2.largestOccurrenceIndex + 1) == ["This"]
+
+def test_load_invalidIndexFile(tmp_path):
+    pathToIndexFile = tmp_path / "invalid.idx"
+    pathToIndexFile.write_bytes(b"not an index file, just some text")
+    
+    with pytest.raises(AssertionError):
+        WordOccurrences.load(pathToIndexFile)
+    
+    WordOccurrences._fromWordOccurrenceDict({"word": 1}).save(pathToIndexFile)
+    pathToIndexFile.write_bytes(pathToIndexFile.read_bytes()[:-1])
+    
+    with pytest.raises(AssertionError):
+        WordOccurrences.load(pathToIndexFile)
+
+
+@pytest.mark.parametrize("sampleFileName", ["Sample1.txt", "Sample2.txt"])
+@pytest.mark.parametrize("chunkSize", [7, DEFAULT_NUMPY_CHUNK_SIZE])
+def test_fromFileNumpy(sampleFileName, chunkSize):
+    pytest.importorskip("numpy")
+    
+    textfilePath = os.path.join(os.path.dirname(__file__), "sample_data", sampleFileName)
+    wordOccurrences = WordOccurrences(textfilePath)
+    numpyWordOccurrences = WordOccurrences.fromFileNumpy(textfilePath, chunkSize)
+    
+    assert numpyWordOccurrences.wordOccurrenceDict == wordOccurrences.wordOccurrenceDict
+    assert numpyWordOccurrences.occurrenceWordDict == wordOccurrences.occurrenceWordDict
+    assert numpyWordOccurrences.largestOccurrenceIndex == wordOccurrences.largestOccurrenceIndex
+    assert numpyWordOccurrences.topK(10) == wordOccurrences.topK(10)
+    assert all(type(numberOfOccurrences) is int for numberOfOccurrences in numpyWordOccurrences.wordOccurrenceDict.values())
+
+@pytest.mark.parametrize("chunkSize", [1, 5, 64, DEFAULT_NUMPY_CHUNK_SIZE])
+def test_fromFileNumpy_mixedText(tmp_path, chunkSize):
+    pytest.importorskip("numpy")
+    import random
+    
+    randomGenerator = random.Random(chunkSize)
+    words = ["a", "ab", "abcdefg", "abcdefgh", "abcdefghi", "abcdefgh\x01", "longer-than-sixteen-bytes", "longer-than-sixteen-bytez", "x" * 40, "It's", "café", "naïve"]
+    separators = [" ", "\n", "\t", "\r\n", "  ", ". ", "\x1c", "\u00a0", "\u2003"]
+    
+    textfilePath = tmp_path / "mixed.txt"
+    textfilePath.write_text("".join(randomGenerator.choice(words) + randomGenerator.choice(separators) for _ in range(3000)), encoding="utf-8", newline="")
+    
+    wordOccurrences = WordOccurrences(textfilePath)
+    numpyWordOccurrences = WordOccurrences.fromFileNumpy(textfilePath, chunkSize)
+    
+    assert list(numpyWordOccurrences.wordOccurrenceDict.items()) == list(wordOccurrences.wordOccurrenceDict.items())
+    assert numpyWordOccurrences.occurrenceWordDict == wordOccurrences.occurrenceWordDict
+
+def test_countAsciiWordsNumpy_sharedPrefixes():
+    pytest.importorskip("numpy")
+    import textproc.lab1
+    
+    # Words of a length group that only differ in their last 8 byte column, or in a zero byte
+    text = b"abcdefghij short abcdefghik abcdefghij short abcdefg\x00 abcdefg abcdefg\x00 "
+    
+    assert list(textproc.lab1._countAsciiWordsNumpy(text).items()) == [("abcdefghij", 2), ("short", 2), ("abcdefghik", 1), ("abcdefg\x00", 2), ("abcdefg", 1)]
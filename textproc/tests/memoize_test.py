@@ -0,0 +1,112 @@
+import asyncio, threading, time
+import pytest
+
+from textproc.memoize import *
+from textproc.lab1_part2 import OrderedLRUCache, CompactLRUCache
+
+def test_cached_sync():
+    calls = []
+    
+    @cached(cache=OrderedLRUCache(2))
+    def square(number, offset=0):
+        calls.append(number)
+        return number * number + offset if number >= 0 else -1
+    
+    assert square(3) == 9
+    assert square(3) == 9
+    assert square(-5) == -1
+    assert square(-5) == -1, "ERR: A result of -1 must not be treated as a cache miss"
+    assert calls == [3, -5]
+    
+    assert square(3, offset=1) == 10
+    assert square(4) == 16                  # Capacity 2, evicts square(-5)
+    square(-5)
+    assert calls == [3, -5, 3, 4, -5]
+    assert len(square.cache) == 2
+
+def test_cached_customKey():
+    calls = []
+    
+    @cached(cache=CompactLRUCache(10), key=lambda text, ignored: text.lower())
+    def normalize(text, ignored):
+        calls.append(text)
+        return text.lower()
+    
+    assert normalize("Hello", 1) == normalize("HELLO", 2) == "hello"
+    assert calls == ["Hello"]
+
+def test_cached_sync_coalescesThreads():
+    calls = []
+    started = threading.Event()
+    
+    @cached()
+    def slowLookup(key):
+        calls.append(key)
+        started.set()
+        time.sleep(0.1)
+        return key * 2
+    
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(slowLookup(21))) for _ in range(8)]
+    for thread in threads: thread.start()
+    for thread in threads: thread.join()
+    
+    assert results == [42] * 8
+    assert calls == [21], "ERR: Concurrent calls for a cold key were not coalesced"
+
+def test_cached_sync_exceptionsNotCached():
+    calls = []
+    
+    @cached()
+    def flaky(key):
+        calls.append(key)
+        if len(calls) == 1: raise ValueError("first call fails")
+        return key
+    
+    with pytest.raises(ValueError):
+        flaky(1)
+    
+    assert flaky(1) == 1
+    assert calls == [1, 1]
+
+def test_cached_async_coalescesTasks():
+    calls = []
+    
+    @cached(cache=OrderedLRUCache(10))
+    async def fetch(key):
+        calls.append(key)
+        await asyncio.sleep(0.05)
+        return key.upper()
+    
+    async def run():
+        results = await asyncio.gather(*(fetch("job") for _ in range(50)), fetch("resume"))
+        assert results == ["JOB"] * 50 + ["RESUME"]
+        assert await fetch("job") == "JOB"
+    
+    asyncio.run(run())
+    assert sorted(calls) == ["job", "resume"]
+
+def test_cached_async_exceptionsAndCancellation():
+    calls = []
+    
+    @cached()
+    async def fetch(key):
+        calls.append(key)
+        await asyncio.sleep(0.05)
+        if key == "bad": raise KeyError(key)
+        return key
+    
+    async def run():
+        results = await asyncio.gather(fetch("bad"), fetch("bad"), return_exceptions=True)
+        assert all(isinstance(result, KeyError) for result in results)
+        
+        # Cancelling one waiter does not cancel the shared computation
+        cancelledCall = asyncio.ensure_future(fetch("good"))
+        otherCall = asyncio.ensure_future(fetch("good"))
+        await asyncio.sleep(0.01)
+        cancelledCall.cancel()
+        assert await otherCall == "good"
+        assert await fetch("good") == "good"
+        
+    asyncio.run(run())
+    assert calls == ["bad", "good"]
@@ -0,0 +1,88 @@
+import multiprocessing
+import pytest
+
+from textproc.shared_cache import *
+from textproc.lab1_part2 import OrderedLRUCache
+
+@pytest.mark.parametrize("capacity", [1, 2, 10, 100])
+def test_SharedLRUCache_matchesOrderedLRUCache(capacity):
+    import random
+    
+    randomGenerator = random.Random(capacity)
+    referenceCache = OrderedLRUCache(capacity)
+    
+    with SharedLRUCache(capacity, keySize=8, valueSize=16, numStripes=1) as cache:
+        for _ in range(3000):
+            key = str(randomGenerator.randrange(capacity * 3)).encode()
+            
+            if randomGenerator.random() < 0.5:
+                assert cache.get(key) == referenceCache.get(key)
+            else:
+                value = b"v" * randomGenerator.randrange(17)
+                cache.put(key, value)
+                referenceCache.put(key, value)
+                
+            assert len(cache) == len(referenceCache)
+
+def test_SharedLRUCache_stripes():
+    with SharedLRUCache(64, keySize=8, valueSize=8, numStripes=4) as cache:
+        for key in range(1000): cache.put(str(key).encode(), b"x")
+        
+        assert len(cache) == 64, "ERR: Stripes together exceed the capacity"
+        assert b"999" in cache
+        assert cache.get(b"missing") == -1
+        
+        with pytest.raises(AssertionError):
+            cache.put(b"123456789", b"")
+
+def putFromWorker(cache, workerIndex):
+    for key in range(50): cache.put(f"{workerIndex}:{key}".encode(), str(key * workerIndex).encode())
+    
+    cache.close()
+
+def test_SharedLRUCache_acrossProcesses():
+    with SharedLRUCache(500, keySize=16, valueSize=16) as cache:
+        workers = [multiprocessing.Process(target=putFromWorker, args=(cache, workerIndex)) for workerIndex in range(1, 5)]
+        for worker in workers: worker.start()
+        for worker in workers: worker.join()
+        
+        assert all(worker.exitcode == 0 for worker in workers)
+        assert len(cache) == 200
+        assert cache.get(b"3:7") == b"21"
+        assert cache.get(b"4:49") == b"196"
+
+def putFromSeparateProcess(name, workerIndex):
+    # Attaches by name like a separately started worker, nothing is inherited from the test process
+    cache = SharedLRUCache(2000, keySize=16, valueSize=16, numStripes=2, name=name)
+    for key in range(400): cache.put(f"{workerIndex}:{key}".encode(), str(key * workerIndex).encode())
+    
+    cache.close()
+
+def test_SharedLRUCache_byName():
+    import uuid
+    
+    name = f"textproc-test-{uuid.uuid4().hex[:12]}"
+    cache = SharedLRUCache(2000, keySize=16, valueSize=16, numStripes=2, name=name)
+    
+    try:
+        context = multiprocessing.get_context("spawn")
+        workers = [context.Process(target=putFromSeparateProcess, args=(name, workerIndex)) for workerIndex in range(1, 5)]
+        for worker in workers: worker.start()
+        for worker in workers: worker.join()
+        
+        assert all(worker.exitcode == 0 for worker in workers)
+        assert len(cache) == 1600
+        assert cache.get(b"3:7") == b"21"
+        assert cache.get(b"4:399") == b"1596"
+        
+        with pytest.raises(AssertionError):
+            SharedLRUCache(1000, keySize=16, valueSize=16, numStripes=2, name=name)
+        
+    finally:
+        cache.unlink()
+        cache.close()
+    
+    # A new block of the same name starts empty
+    with SharedLRUCache(2000, keySize=16, valueSize=16, numStripes=2, name=name) as cache:
+        assert len(cache) == 0
+        cache.unlink()
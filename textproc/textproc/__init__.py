@@ -1 +1 @@
-__all__ = ["lab1", "lab1_part2"]
\ No newline at end of file
+__all__ = ["lab1", "lab1_part2", "benchmark", "concurrent_cache", "cache_policies", "cache_stats", "shared_cache", "memoize"]
\ No newline at end of file
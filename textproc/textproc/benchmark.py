@@ -0,0 +1,384 @@
+"""
+Reproducible benchmarks for textproc.
+
+Generates synthetic Zipfian corpora and measures WordOccurrences construction, printTopKOccurrences and
+LRUCache get / put (and hit ratio) under uniform, Zipfian, scan and Zipfian-with-scans access patterns, plus any
+recorded key traces passed with --traces (one key per line), and the overhead of InstrumentedCache on every cache.
+Every benchmark case runs in a fresh worker process so its peak RSS is not polluted by earlier cases. Results are
+written as JSON.
+
+Usage:
+    python -m textproc.benchmark --sizes 1MB 100MB 1GB --output results.json
+"""
+import os, sys, io, json, time, random, string, platform, argparse, tempfile, contextlib, itertools, bisect, functools, typing
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import resource
+except ImportError: # Not available on Windows, peak RSS is reported as None there
+    resource = None
+
+from textproc.lab1 import WordOccurrences
+from textproc.lab1_part2 import LRUCache, OrderedLRUCache, CompactLRUCache, ExpiringLRUCache
+from textproc.concurrent_cache import ConcurrentLRUCache
+from textproc.cache_policies import PolicyCache, EVICTION_POLICIES
+from textproc.cache_stats import InstrumentedCache
+
+SIZE_UNITS:typing.Dict[str, int] = {"KB": 1 << 10, "MB": 1 << 20, "GB": 1 << 30}
+
+# Name: factory(pathToTxtFile) for every WordOccurrences construction path that is benchmarked
+WORD_OCCURRENCES_CONSTRUCTORS:typing.Dict[str, typing.Callable[[str], WordOccurrences]] = {
+    "WordOccurrences": WordOccurrences,
+    "WordOccurrences.fromFileStream": WordOccurrences.fromFileStream,
+    "WordOccurrences.fromFileParallel": WordOccurrences.fromFileParallel,
+    "WordOccurrences.fromFileNumpy": WordOccurrences.fromFileNumpy,
+}
+
+# Name: factory(capacity) for every cache implementation that is benchmarked
+CACHE_IMPLEMENTATIONS:typing.Dict[str, typing.Callable[[int], typing.Any]] = {
+    "LRUCache": LRUCache,
+    "OrderedLRUCache": OrderedLRUCache,
+    "CompactLRUCache": CompactLRUCache,
+    "ConcurrentLRUCache": ConcurrentLRUCache,
+    "ExpiringLRUCache": ExpiringLRUCache,
+    **{f"PolicyCache[{policyName}]": functools.partial(PolicyCache, policyFactory=policy) for policyName, policy in EVICTION_POLICIES.items()},
+}
+
+ACCESS_PATTERNS:typing.List[str] = ["uniform", "zipfian", "scan", "zipfianWithScans"]
+
+# Name: instrument(cache) for every way of running a cache that benchmarkCacheStats compares
+CACHE_STATS_VARIANTS:typing.Dict[str, typing.Callable[[typing.Any], typing.Any]] = {
+    "uninstrumented": lambda cache: cache,
+    "counters": InstrumentedCache,
+    "sampledLatency": functools.partial(InstrumentedCache, sampleEvery=64),
+}
+
+
+def parseSize(size:str) -> int:
+    """
+    Converts a human readable size such as "100MB" to a number of bytes.
+
+    Args:
+        size (str): Number followed by KB / MB / GB
+
+    Returns:
+        int: Number of bytes
+    """
+
+    unit = size[-2:].upper()
+    assert unit in SIZE_UNITS and size[:-2].isdigit(), f"ERR: Invalid size: {size}"
+
+    return int(size[:-2]) * SIZE_UNITS[unit]
+
+def generateCorpus(pathToTxtFile: os.PathLike, sizeInBytes:int, vocabularySize:int = 50_000, seed:int = 0):
+    """
+    Writes a synthetic text file of roughly `sizeInBytes` bytes whose word frequencies follow a Zipfian distribution.
+    The same arguments always produce the same file.
+
+    Args:
+        pathToTxtFile (os.PathLike): path to write the corpus to
+        sizeInBytes (int): Approximate size of the corpus
+        vocabularySize (int, optional): Number of distinct words. Defaults to 50_000.
+        seed (int, optional): Random seed. Defaults to 0.
+    """
+
+    randomGenerator = random.Random(seed)
+    vocabulary = ["".join(randomGenerator.choices(string.ascii_lowercase, k=randomGenerator.randint(2, 10))) for _ in range(vocabularySize)]
+    cumulativeWeights = list(itertools.accumulate(1 / rank for rank in range(1, vocabularySize + 1)))
+    punctuation = [" ", " ", " ", " ", " ", " ", ", ", ". ", ".\n"]
+
+    bytesWritten:int = 0
+    with open(pathToTxtFile, 'w') as txtFile:
+        while bytesWritten < sizeInBytes:
+            words = randomGenerator.choices(vocabulary, cum_weights=cumulativeWeights, k=10_000)
+            separators = randomGenerator.choices(punctuation, k=10_000)
+            block = "".join(word + separator for word, separator in zip(words, separators))
+
+            txtFile.write(block)
+            bytesWritten += len(block)
+
+def generateKeys(accessPattern:str, numOperations:int, keySpace:int, seed:int = 0) -> typing.List[int]:
+    """
+    Generates the sequence of keys a cache benchmark accesses.
+
+    Args:
+        accessPattern (str): "uniform", "zipfian" (skewed towards low keys), "scan" (keys 0..keySpace in a loop) or
+                             "zipfianWithScans" (zipfian traffic interrupted by one-off scans over keys never seen again)
+        numOperations (int): Number of keys to generate
+        keySpace (int): Number of distinct keys
+        seed (int, optional): Random seed. Defaults to 0.
+
+    Returns:
+        typing.List[int]: Keys in access order
+    """
+
+    randomGenerator = random.Random(seed)
+
+    if accessPattern == "uniform":
+        return [randomGenerator.randrange(keySpace) for _ in range(numOperations)]
+
+    if accessPattern == "zipfian":
+        cumulativeWeights = list(itertools.accumulate(1 / rank for rank in range(1, keySpace + 1)))
+        return [bisect.bisect(cumulativeWeights, randomGenerator.random() * cumulativeWeights[-1]) for _ in range(numOperations)]
+
+    if accessPattern == "scan":
+        return [operation % keySpace for operation in range(numOperations)]
+
+    if accessPattern == "zipfianWithScans":
+        scanLength = max(1, keySpace // 10)
+        zipfianKeys = iter(generateKeys("zipfian", numOperations, keySpace, seed))
+        keys:typing.List[int] = []
+
+        for scanStart in itertools.count(keySpace, scanLength):
+            if len(keys) >= numOperations: break
+
+            keys.extend(itertools.islice(zipfianKeys, 4 * scanLength))
+            keys.extend(range(scanStart, scanStart + scanLength))
+
+        return keys[:numOperations]
+
+    raise ValueError(f"ERR: Unknown access pattern: {accessPattern}")
+
+def loadTrace(pathToTraceFile: os.PathLike) -> typing.List[typing.Union[int, str]]:
+    """
+    Reads a recorded key trace, one key per line. Keys that look like integers are converted to int.
+
+    Args:
+        pathToTraceFile (os.PathLike): the path/to/the/trace
+
+    Returns:
+        typing.List[typing.Union[int, str]]: Keys in access order
+    """
+
+    with open(pathToTraceFile, 'r') as traceFile:
+        return [int(key) if key.lstrip("-").isdigit() else key for key in (line.strip() for line in traceFile) if key]
+
+def summarizeLatencies(name:str, latencies:typing.List[float], **details) -> typing.Dict[str, typing.Any]:
+    """
+    Summarizes per operation latencies into ops/s and p50 / p99 latency.
+
+    Args:
+        name (str): Name of the benchmark
+        latencies (typing.List[float]): Seconds taken by each operation
+        **details: Extra fields to add to the result
+
+    Returns:
+        typing.Dict[str, typing.Any]: JSON serializable result
+    """
+
+    latencies = sorted(latencies)
+    percentile = lambda fraction: latencies[min(len(latencies) - 1, int(fraction * len(latencies)))] if latencies else None
+    totalSeconds = sum(latencies)
+
+    return {
+        "benchmark": name,
+        **details,
+        "operations": len(latencies),
+        "opsPerSecond": len(latencies) / totalSeconds if totalSeconds > 0 else None,
+        "p50Seconds": percentile(0.50),
+        "p99Seconds": percentile(0.99),
+    }
+
+def getPeakRssBytes() -> typing.Optional[int]:
+    """
+    Returns:
+        typing.Optional[int]: Peak resident set size of the current process in bytes, None if it cannot be measured
+    """
+
+    if resource is None: return None
+
+    peakRss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    return peakRss if sys.platform == "darwin" else peakRss * 1024 # Linux reports KiB, macOS reports bytes
+
+def benchmarkWordOccurrences(constructorName:str, pathToTxtFile:str, corpusName:str, repeats:int, k:int) -> typing.List[typing.Dict[str, typing.Any]]:
+    """
+    Measures building WordOccurrences with `constructorName` and printing its top `k` occurrences.
+    Note: Runs in a worker process, see runInFreshProcess
+
+    Returns:
+        typing.List[typing.Dict[str, typing.Any]]: One result for construction and one for printTopKOccurrences
+    """
+
+    constructor = WORD_OCCURRENCES_CONSTRUCTORS[constructorName]
+    constructionLatencies:typing.List[float] = []
+
+    for _ in range(repeats):
+        start = time.perf_counter()
+        wordOccurrences = constructor(pathToTxtFile)
+        constructionLatencies.append(time.perf_counter() - start)
+
+    printLatencies:typing.List[float] = []
+    for options in WordOccurrences.Options:
+        for _ in range(repeats):
+            with contextlib.redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                wordOccurrences.printTopKOccurrences(k, options)
+                printLatencies.append(time.perf_counter() - start)
+
+    peakRssBytes = getPeakRssBytes()
+
+    return [
+        summarizeLatencies(constructorName, constructionLatencies, corpus=corpusName, peakRssBytes=peakRssBytes),
+        summarizeLatencies(f"{constructorName}.printTopKOccurrences", printLatencies, corpus=corpusName, k=k, peakRssBytes=peakRssBytes),
+    ]
+
+def benchmarkCache(cacheName:str, accessPattern:str, capacity:int, keySpace:int, numOperations:int, pathToTraceFile:typing.Optional[str] = None) -> typing.List[typing.Dict[str, typing.Any]]:
+    """
+    Measures `cacheName` get / put latency and hit ratio as a read-through cache: every key is looked up with get and
+    put on a miss. Keys come from `accessPattern`, or from the recorded trace at `pathToTraceFile` when given.
+    Note: Runs in a worker process, see runInFreshProcess
+
+    Returns:
+        typing.List[typing.Dict[str, typing.Any]]: One result for get and one for put
+    """
+
+    cache = CACHE_IMPLEMENTATIONS[cacheName](capacity)
+    keys = loadTrace(pathToTraceFile) if pathToTraceFile else generateKeys(accessPattern, numOperations, keySpace)
+    perfCounter = time.perf_counter
+    getLatencies:typing.List[float] = []
+    putLatencies:typing.List[float] = []
+    hits:int = 0
+
+    for key in keys:
+        start = perfCounter()
+        value = cache.get(key)
+        getLatencies.append(perfCounter() - start)
+
+        if value != -1:
+            hits += 1
+            continue
+
+        start = perfCounter()
+        cache.put(key, key)
+        putLatencies.append(perfCounter() - start)
+
+    details = {"cache": cacheName, "accessPattern": accessPattern, "capacity": capacity, "keySpace": keySpace, "peakRssBytes": getPeakRssBytes()}
+
+    return [
+        summarizeLatencies(f"{cacheName}.get", getLatencies, hitRatio=hits / len(keys) if keys else None, **details),
+        summarizeLatencies(f"{cacheName}.put", putLatencies, **details),
+    ]
+
+def benchmarkCacheStats(cacheName:str, accessPattern:str, capacity:int, keySpace:int, numOperations:int, repeats:int) -> typing.List[typing.Dict[str, typing.Any]]:
+    """
+    Measures the overhead of InstrumentedCache on `cacheName` in the read-through loop of benchmarkCache. The whole loop
+    is timed, as timing every call would cost more than the counting, once for every CACHE_STATS_VARIANTS entry. The
+    variants take turns for `repeats` rounds so changing machine load affects them alike, and the fastest round counts.
+    Note: Runs in a worker process, see runInFreshProcess
+
+    Returns:
+        typing.List[typing.Dict[str, typing.Any]]: One result per variant, "overhead" is its extra time relative to "uninstrumented"
+    """
+
+    keys = generateKeys(accessPattern, numOperations, keySpace)
+    perfCounter = time.perf_counter
+    bestSeconds:typing.Dict[str, float] = dict.fromkeys(CACHE_STATS_VARIANTS, float("inf"))
+
+    for _ in range(repeats):
+        for variant, instrument in CACHE_STATS_VARIANTS.items():
+            cache = instrument(CACHE_IMPLEMENTATIONS[cacheName](capacity))
+            get, put = cache.get, cache.put
+
+            start = perfCounter()
+            for key in keys:
+                if get(key) == -1: put(key, key)
+            bestSeconds[variant] = min(bestSeconds[variant], perfCounter() - start)
+
+    return [{
+        "benchmark": f"{cacheName}.stats.{variant}",
+        "cache": cacheName,
+        "accessPattern": accessPattern,
+        "capacity": capacity,
+        "keySpace": keySpace,
+        "operations": len(keys),
+        "opsPerSecond": len(keys) / seconds if seconds > 0 else None,
+        "p50Seconds": None, # Only the whole loop is timed
+        "p99Seconds": None,
+        "overhead": seconds / bestSeconds["uninstrumented"] - 1 if bestSeconds["uninstrumented"] > 0 else None,
+    } for variant, seconds in bestSeconds.items()]
+
+def runInFreshProcess(function:typing.Callable, *args) -> typing.List[typing.Dict[str, typing.Any]]:
+    """
+    Runs a benchmark function in a new worker process so peak RSS only reflects that benchmark.
+    """
+
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        return executor.submit(function, *args).result()
+
+def runBenchmarks(sizes:typing.List[str], corpusFolder: os.PathLike, repeats:int = 3, k:int = 10,
+                  cacheCapacity:int = 10_000, cacheKeySpace:int = 100_000, cacheOperations:int = 200_000,
+                  constructorNames:typing.Optional[typing.List[str]] = None, cacheNames:typing.Optional[typing.List[str]] = None,
+                  traceFiles:typing.Optional[typing.List[str]] = None) -> typing.Dict[str, typing.Any]:
+    """
+    Runs every benchmark and returns the results as a JSON serializable dictionary.
+
+    Args:
+        sizes (typing.List[str]): Corpus sizes such as ["1MB", "100MB", "1GB"], corpora are generated once and reused
+        corpusFolder (os.PathLike): Folder the generated corpora are kept in
+        repeats (int, optional): Number of WordOccurrences constructions per corpus. Defaults to 3.
+        k (int, optional): k passed to printTopKOccurrences. Defaults to 10.
+        cacheCapacity (int, optional): Capacity of the benchmarked caches. Defaults to 10_000.
+        cacheKeySpace (int, optional): Number of distinct keys accessed. Defaults to 100_000.
+        cacheOperations (int, optional): Number of keys accessed per access pattern. Defaults to 200_000.
+        constructorNames (typing.List[str], optional): Subset of WORD_OCCURRENCES_CONSTRUCTORS to run. Defaults to all.
+        cacheNames (typing.List[str], optional): Subset of CACHE_IMPLEMENTATIONS to run. Defaults to all.
+        traceFiles (typing.List[str], optional): Recorded key traces to replay against every cache. Defaults to None.
+
+    Returns:
+        typing.Dict[str, typing.Any]: {"environment": {...}, "results": [...]}
+    """
+
+    os.makedirs(corpusFolder, exist_ok=True)
+    results:typing.List[typing.Dict[str, typing.Any]] = []
+
+    for size in sizes:
+        pathToTxtFile = os.path.join(corpusFolder, f"corpus_{size}.txt")
+        if not os.path.exists(pathToTxtFile):
+            generateCorpus(pathToTxtFile, parseSize(size))
+
+        for constructorName in constructorNames or WORD_OCCURRENCES_CONSTRUCTORS:
+            try:
+                results.extend(runInFreshProcess(benchmarkWordOccurrences, constructorName, pathToTxtFile, size, repeats, k))
+            except ImportError as error: # Optional backends whose dependency is not installed
+                results.append({"benchmark": constructorName, "corpus": size, "skipped": str(error)})
+
+    for cacheName in cacheNames or CACHE_IMPLEMENTATIONS:
+        for accessPattern in ACCESS_PATTERNS:
+            results.extend(runInFreshProcess(benchmarkCache, cacheName, accessPattern, cacheCapacity, cacheKeySpace, cacheOperations))
+
+        for pathToTraceFile in traceFiles or []:
+            results.extend(runInFreshProcess(benchmarkCache, cacheName, f"trace:{os.path.basename(pathToTraceFile)}", cacheCapacity, cacheKeySpace, cacheOperations, pathToTraceFile))
+
+        results.extend(runInFreshProcess(benchmarkCacheStats, cacheName, "zipfian", cacheCapacity, cacheKeySpace, cacheOperations, repeats))
+
+    return {
+        "environment": {"python": platform.python_version(), "platform": platform.platform(), "cpuCount": os.cpu_count()},
+        "results": results,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks textproc word counting and LRU caches")
+    parser.add_argument("--sizes", nargs="+", default=["1MB"], help="Corpus sizes to benchmark, e.g. 1MB 100MB 1GB")
+    parser.add_argument("--corpus-folder", default=os.path.join(tempfile.gettempdir(), "textproc_benchmark"), help="Folder generated corpora are kept in")
+    parser.add_argument("--repeats", type=int, default=3, help="WordOccurrences constructions per corpus")
+    parser.add_argument("--k", type=int, default=10, help="k passed to printTopKOccurrences")
+    parser.add_argument("--cache-capacity", type=int, default=10_000)
+    parser.add_argument("--cache-key-space", type=int, default=100_000)
+    parser.add_argument("--cache-operations", type=int, default=200_000)
+    parser.add_argument("--constructors", nargs="+", choices=list(WORD_OCCURRENCES_CONSTRUCTORS), help="Defaults to all")
+    parser.add_argument("--caches", nargs="+", choices=list(CACHE_IMPLEMENTATIONS), help="Defaults to all")
+    parser.add_argument("--traces", nargs="+", help="Recorded key traces (one key per line) to replay against every cache")
+    parser.add_argument("--output", help="Path to write the JSON results to, printed to stdout if omitted")
+    args = parser.parse_args()
+
+    benchmarkResults = runBenchmarks(args.sizes, args.corpus_folder, args.repeats, args.k,
+                                     args.cache_capacity, args.cache_key_space, args.cache_operations,
+                                     args.constructors, args.caches, args.traces)
+
+    if args.output:
+        with open(args.output, 'w') as outputFile:
+            json.dump(benchmarkResults, outputFile, indent=4)
+    else:
+        print(json.dumps(benchmarkResults, indent=4))
@@ -0,0 +1,379 @@
+import abc, typing
+from collections import OrderedDict
+
+from textproc.cache_stats import useCountingClass
+
+
+class EvictionPolicy(abc.ABC):
+    """
+    Decides which keys a PolicyCache keeps. The policy only tracks keys, PolicyCache stores the values.
+
+    Methods:
+        onGet(key, hit: bool): Called for every get, hit or miss
+        onUpdate(key): Called when a resident key's value is replaced by put
+        onInsert(key) -> list: Abstract, called when put adds a new key, returns the keys that are no longer resident. The returned
+                               keys may include `key` itself when an admission policy rejects it.
+    """
+
+    def __init__(self, capacity:int):
+        assert capacity > 0, "ERR: capacity must be positive"
+        self.capacity:int = capacity
+
+    def onGet(self, key, hit:bool):
+        pass
+
+    def onUpdate(self, key):
+        pass
+
+    @abc.abstractmethod
+    def onInsert(self, key) -> typing.List:
+        pass
+
+
+class PolicyCache(object):
+    """
+    Cache with a pluggable EvictionPolicy, behind the same get / put API as LRUCache.
+
+    Usage:
+        cache = PolicyCache(capacity, TinyLFUPolicy)
+    """
+
+    def __init__(self, capacity, policyFactory = None):
+        """
+        :type capacity: int
+        :type policyFactory: Callable[[int], EvictionPolicy], defaults to LRUPolicy
+        """
+        self._dataFromKey:dict = {}
+        self.policy:EvictionPolicy = (policyFactory or LRUPolicy)(capacity)
+
+    def get(self, key):
+        """
+        :type key: int
+        :rtype: int
+        """
+
+        if not key in self._dataFromKey:
+            self.policy.onGet(key, False)
+            return -1
+
+        self.policy.onGet(key, True)
+
+        return self._dataFromKey[key]
+
+    def put(self, key, value):
+        """
+        :type key: int
+        :type value: int
+        :rtype: None
+        """
+
+        if key in self._dataFromKey:
+            self._dataFromKey[key] = value
+            self.policy.onUpdate(key)
+            return
+
+        self._dataFromKey[key] = value
+
+        for evictedKey in self.policy.onInsert(key):
+            del self._dataFromKey[evictedKey]
+
+    def __len__(self):
+        return len(self._dataFromKey)
+
+    def __contains__(self, key):
+        return key in self._dataFromKey
+
+    def startCounting(self):
+        """
+        Counts hits, misses, inserts, replaces and evictions in `self.counters` from now on, see useCountingClass.
+        """
+        useCountingClass(self, _CountingPolicyCache)
+
+
+class _CountingPolicyCache(PolicyCache):
+    """
+    PolicyCache that counts its calls in `counters`, see PolicyCache.startCounting. New keys the policy rejects count as
+    inserted and evicted. get / put are copies of PolicyCache's with the counting added, so counting costs no extra call.
+    """
+
+    def get(self, key):
+        if not key in self._dataFromKey:
+            self.policy.onGet(key, False)
+            self.counters.misses += 1
+            return -1
+
+        self.policy.onGet(key, True)
+        self.counters.hits += 1
+
+        return self._dataFromKey[key]
+
+    def put(self, key, value):
+        if key in self._dataFromKey:
+            self._dataFromKey[key] = value
+            self.policy.onUpdate(key)
+            self.counters.replaces += 1
+            return
+
+        self._dataFromKey[key] = value
+        evictedKeys:typing.List = self.policy.onInsert(key)
+
+        for evictedKey in evictedKeys:
+            del self._dataFromKey[evictedKey]
+
+        self.counters.inserts += 1
+        self.counters.evictions += len(evictedKeys)
+
+
+class LRUPolicy(EvictionPolicy):
+    """
+    Plain least recently used eviction, the baseline the other policies are compared against.
+    """
+
+    def __init__(self, capacity:int):
+        super().__init__(capacity)
+        self._keys:OrderedDict = OrderedDict()
+
+    def onGet(self, key, hit:bool):
+        if hit: self._keys.move_to_end(key)
+
+    def onUpdate(self, key):
+        self._keys.move_to_end(key)
+
+    def onInsert(self, key) -> typing.List:
+        self._keys[key] = None
+
+        return [self._keys.popitem(last=False)[0]] if len(self._keys) > self.capacity else []
+
+
+class TwoQueuePolicy(EvictionPolicy):
+    """
+    2Q eviction (Johnson & Shasha). New keys enter a small FIFO (A1in). Keys evicted from it are remembered in a ghost
+    FIFO of keys only (A1out). Only a key seen again while in A1out is promoted to the main LRU (Am), so a one-off scan
+    flows through A1in without flushing Am.
+    """
+
+    def __init__(self, capacity:int, inFraction:float = 0.25, outFraction:float = 0.5):
+        super().__init__(capacity)
+        self._maxIn:int = max(1, int(capacity * inFraction))
+        self._maxOut:int = max(1, int(capacity * outFraction))
+        self._in:OrderedDict = OrderedDict()
+        self._out:OrderedDict = OrderedDict()
+        self._main:OrderedDict = OrderedDict()
+
+    def onGet(self, key, hit:bool):
+        if hit and key in self._main: self._main.move_to_end(key) # Hits in A1in deliberately do not reorder it
+
+    def onUpdate(self, key):
+        self.onGet(key, True)
+
+    def onInsert(self, key) -> typing.List:
+        if key in self._out:
+            del self._out[key]
+            self._main[key] = None
+        else:
+            self._in[key] = None
+
+        evictedKeys:typing.List = []
+
+        while len(self._in) + len(self._main) > self.capacity:
+            if len(self._in) > self._maxIn or not self._main:
+                evictedKey = self._in.popitem(last=False)[0]
+
+                self._out[evictedKey] = None
+                if len(self._out) > self._maxOut: self._out.popitem(last=False)
+            else:
+                evictedKey = self._main.popitem(last=False)[0]
+
+            evictedKeys.append(evictedKey)
+
+        return evictedKeys
+
+
+class ARCPolicy(EvictionPolicy):
+    """
+    Adaptive Replacement Cache (Megiddo & Modha). Resident keys are split between T1 (seen once recently) and T2 (seen
+    at least twice). Ghost lists B1 / B2 remember keys recently evicted from each. A miss that hits a ghost list shifts
+    the target size `p` of T1 towards the list that would have kept the key, so the balance between recency and
+    frequency adapts to the workload.
+    """
+
+    def __init__(self, capacity:int):
+        super().__init__(capacity)
+        self._p:float = 0
+        self._t1:OrderedDict = OrderedDict()
+        self._t2:OrderedDict = OrderedDict()
+        self._b1:OrderedDict = OrderedDict()
+        self._b2:OrderedDict = OrderedDict()
+
+    def onGet(self, key, hit:bool):
+        if not hit: return
+
+        if key in self._t1: del self._t1[key]
+        else: del self._t2[key]
+
+        self._t2[key] = None
+
+    def onUpdate(self, key):
+        self.onGet(key, True)
+
+    def onInsert(self, key) -> typing.List:
+        evictedKeys:typing.List = []
+        isFull:bool = len(self._t1) + len(self._t2) >= self.capacity
+
+        if key in self._b1:
+            self._p = min(self.capacity, self._p + max(len(self._b2) / len(self._b1), 1))
+            del self._b1[key]
+            if isFull: evictedKeys.append(self._replace(False))
+            self._t2[key] = None
+
+        elif key in self._b2:
+            self._p = max(0, self._p - max(len(self._b1) / len(self._b2), 1))
+            del self._b2[key]
+            if isFull: evictedKeys.append(self._replace(True))
+            self._t2[key] = None
+
+        else:
+            if len(self._t1) + len(self._b1) >= self.capacity:
+                if len(self._t1) < self.capacity:
+                    self._b1.popitem(last=False)
+                    if isFull: evictedKeys.append(self._replace(False))
+                else:
+                    evictedKeys.append(self._t1.popitem(last=False)[0])
+
+            elif isFull:
+                if len(self._t1) + len(self._t2) + len(self._b1) + len(self._b2) >= 2 * self.capacity:
+                    self._b2.popitem(last=False)
+                evictedKeys.append(self._replace(False))
+
+            self._t1[key] = None
+
+        return evictedKeys
+
+    def _replace(self, keyInB2:bool):
+        """
+        Evicts the LRU key of T1 or T2 into its ghost list, depending on the target size of T1.
+
+        :rtype: evicted key
+        """
+
+        if self._t1 and (len(self._t1) > self._p or (keyInB2 and len(self._t1) == self._p) or not self._t2):
+            evictedKey = self._t1.popitem(last=False)[0]
+            self._b1[evictedKey] = None
+        else:
+            evictedKey = self._t2.popitem(last=False)[0]
+            self._b2[evictedKey] = None
+
+        return evictedKey
+
+
+class CountMinSketch(object):
+    """
+    Approximate frequency counter with `depth` rows of 4 bit style saturating counters.
+    Once `sampleSize` increments have been recorded every counter is halved, so old popularity fades out.
+    """
+
+    _HASH_SEEDS = (0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9, 0xD6E8FEB86659FD93)
+    _MAX_COUNT = 15
+
+    def __init__(self, width:int, sampleSize:int, depth:int = 4):
+        assert 0 < depth <= len(self._HASH_SEEDS), f"ERR: depth must be between 1 and {len(self._HASH_SEEDS)}"
+
+        self._mask:int = (1 << max(width - 1, 1).bit_length()) - 1 # Width rounded up to a power of 2
+        self._rows:typing.List[typing.List[int]] = [[0] * (self._mask + 1) for _ in range(depth)]
+        self._seeds = self._HASH_SEEDS[:depth]
+        self._sampleSize:int = sampleSize
+        self._numIncrements:int = 0
+
+    def _indexes(self, key):
+        keyHash = hash(key)
+        return [((keyHash ^ seed) * 0x9E3779B1 >> 16) & self._mask for seed in self._seeds]
+
+    def increment(self, key):
+        for row, index in zip(self._rows, self._indexes(key)):
+            if row[index] < self._MAX_COUNT: row[index] += 1
+
+        self._numIncrements += 1
+        if self._numIncrements >= self._sampleSize: self._reset()
+
+    def estimate(self, key) -> int:
+        return min(row[index] for row, index in zip(self._rows, self._indexes(key)))
+
+    def _reset(self):
+        self._numIncrements //= 2
+        for row in self._rows:
+            row[:] = [count >> 1 for count in row]
+
+
+class TinyLFUPolicy(EvictionPolicy):
+    """
+    W-TinyLFU eviction (Einziger, Friedman & Manes). New keys enter a small LRU window (1% of capacity). A key leaving
+    the window only enters the main segmented LRU if the count-min sketch estimates it is more frequent than the main
+    cache's eviction victim. One-off scans therefore never displace frequently used keys. The main cache is split into
+    probation (20%) and protected (80%) segments, and a hit in probation promotes a key to protected.
+    """
+
+    def __init__(self, capacity:int, windowFraction:float = 0.01, protectedFraction:float = 0.8):
+        super().__init__(capacity)
+        self._maxWindow:int = max(1, int(capacity * windowFraction))
+        self._maxMain:int = capacity - self._maxWindow
+        self._maxProtected:int = int(self._maxMain * protectedFraction)
+        self._window:OrderedDict = OrderedDict()
+        self._probation:OrderedDict = OrderedDict()
+        self._protected:OrderedDict = OrderedDict()
+        self.sketch:CountMinSketch = CountMinSketch(width=capacity, sampleSize=10 * capacity)
+
+    def onGet(self, key, hit:bool):
+        self.sketch.increment(key)
+
+        if hit: self._touch(key)
+
+    def onUpdate(self, key):
+        self._touch(key)
+
+    def _touch(self, key):
+        if key in self._window:
+            self._window.move_to_end(key)
+
+        elif key in self._protected:
+            self._protected.move_to_end(key)
+
+        else:
+            del self._probation[key]
+            self._protected[key] = None
+
+            if len(self._protected) > self._maxProtected:
+                self._probation[self._protected.popitem(last=False)[0]] = None
+
+    def onInsert(self, key) -> typing.List:
+        self.sketch.increment(key)
+        self._window[key] = None
+
+        if len(self._window) <= self._maxWindow: return []
+
+        candidateKey = self._window.popitem(last=False)[0]
+
+        if len(self._probation) + len(self._protected) < self._maxMain:
+            self._probation[candidateKey] = None
+            return []
+
+        if self._maxMain == 0: return [candidateKey]
+
+        victimSegment = self._probation if self._probation else self._protected
+        victimKey = next(iter(victimSegment))
+
+        # Admission: keep whichever of the two is estimated to be used more often
+        if self.sketch.estimate(candidateKey) > self.sketch.estimate(victimKey):
+            del victimSegment[victimKey]
+            self._probation[candidateKey] = None
+            return [victimKey]
+
+        return [candidateKey]
+
+
+# Name: EvictionPolicy class, for looking policies up by name (e.g. in textproc.benchmark)
+EVICTION_POLICIES:typing.Dict[str, typing.Type[EvictionPolicy]] = {
+    "LRU": LRUPolicy,
+    "2Q": TwoQueuePolicy,
+    "ARC": ARCPolicy,
+    "W-TinyLFU": TinyLFUPolicy,
+}
@@ -0,0 +1,234 @@
+import time, typing
+
+
+class LatencyHistogram(object):
+    """
+    Histogram of operation latencies with power of 2 nanosecond buckets (128ns, 256ns, ... ~67ms, +Inf).
+    Recording is a bit_length and a list increment, cheap enough for the hot path.
+    """
+
+    _SMALLEST_BUCKET_EXPONENT:int = 7
+    _NUM_BUCKETS:int = 20
+
+    def __init__(self):
+        # Bucket i counts latencies <= 2**(i + _SMALLEST_BUCKET_EXPONENT) ns, the last bucket counts everything larger
+        self.bucketCounts:typing.List[int] = [0] * (self._NUM_BUCKETS + 1)
+        self.count:int = 0
+        self.sumNanoseconds:int = 0
+
+    @classmethod
+    def bucketBoundsSeconds(cls) -> typing.List[float]:
+        """
+        Returns:
+            typing.List[float]: Upper bound in seconds of every bucket except the last (+Inf) one
+        """
+        return [2 ** (bucketIndex + cls._SMALLEST_BUCKET_EXPONENT) / 1e9 for bucketIndex in range(cls._NUM_BUCKETS)]
+
+    def record(self, nanoseconds:int):
+        bucketIndex = max(0, (nanoseconds - 1).bit_length() - self._SMALLEST_BUCKET_EXPONENT)
+        self.bucketCounts[min(bucketIndex, self._NUM_BUCKETS)] += 1
+        self.count += 1
+        self.sumNanoseconds += nanoseconds
+
+    def snapshot(self) -> typing.Dict[str, typing.Any]:
+        """
+        Returns:
+            typing.Dict[str, typing.Any]: {"count", "sumSeconds", "buckets": [(upperBoundSeconds, cumulativeCount)]}
+        """
+
+        cumulativeCounts:typing.List[int] = []
+        runningCount:int = 0
+        for bucketCount in self.bucketCounts:
+            runningCount += bucketCount
+            cumulativeCounts.append(runningCount)
+
+        return {
+            "count": self.count,
+            "sumSeconds": self.sumNanoseconds / 1e9,
+            "buckets": list(zip(self.bucketBoundsSeconds() + [float("inf")], cumulativeCounts)),
+        }
+
+
+class CacheCounters(object):
+    """
+    Hit, miss, insert, replace and eviction counters of a cache engine, kept in its `counters` attribute once its
+    startCounting() was called.
+    """
+
+    __slots__ = ("hits", "misses", "inserts", "replaces", "evictions")
+
+    def __init__(self):
+        self.hits:int = 0
+        self.misses:int = 0
+        self.inserts:int = 0
+        self.replaces:int = 0
+        self.evictions:int = 0
+
+    def __add__(self, other):
+        total = CacheCounters()
+        for field in self.__slots__: setattr(total, field, getattr(self, field) + getattr(other, field))
+
+        return total
+
+
+def useCountingClass(cache, countingClass:type):
+    """
+    Turns on counting by swapping the class of `cache` for `countingClass`, a subclass of its engine whose get / put
+    also update `cache.counters` (a fresh CacheCounters). Engines call this from their startCounting(). Only counted
+    engines run counting code, the engine classes themselves never check whether they are counted.
+
+    :type cache: cache engine
+    :type countingClass: type, counting subclass of type(cache) without attributes (or __slots__) of its own
+    """
+
+    cache.__class__ = countingClass
+
+    # The object keeps its attribute values laid out for the old class, which sends every attribute lookup of the new
+    # class down CPython's slow path (about 2x slower get / put). A plain __dict__ is looked up fast by either class
+    if hasattr(cache, "__dict__"): cache.__dict__ = dict(cache.__dict__)
+
+    cache.counters = CacheCounters()
+
+
+class InstrumentedCache(object):
+    """
+    Turns on the hit, miss, eviction and replace counters of a cache engine (see CacheCounters) and records sampled
+    get / put latency histograms.
+
+    Instrumentation is opt-in and costs nothing until an engine is instrumented: the engine's startCounting() swaps its
+    class for a counting subclass (see useCountingClass), so engines that are not instrumented run no counting code.
+
+    Latency timing is opt-in as well (`sampleEvery`). It times one call in every `sampleEvery`, but needs every call to
+    go through this wrapper. Without it get / put are the engine's own methods and the wrapper adds nothing per call.
+    textproc.benchmark.benchmarkCacheStats measures both overheads.
+
+    Counters of engines with locks (ConcurrentLRUCache, SharedLRUCache) are updated under the lock, so they are exact.
+    The engine may also still be called directly, those calls are counted but not timed.
+
+    Usage:
+        cache = InstrumentedCache(OrderedLRUCache(1000), name="jobs", sampleEvery=64)
+        cache.stats()
+        cache.exportPrometheus()
+    """
+
+    def __init__(self, cache, name = "cache", sampleEvery = None):
+        """
+        :type cache: cache engine with get / put / __len__ / startCounting
+        :type name: str, value of the `cache` label in the Prometheus export
+        :type sampleEvery: int | None, time one in every `sampleEvery` get / put calls, None (default) to not time calls
+        """
+        assert sampleEvery is None or sampleEvery > 0, "ERR: sampleEvery must be positive or None"
+
+        self.cache = cache
+        self.name:str = name
+        self.getLatency:LatencyHistogram = LatencyHistogram()
+        self.putLatency:LatencyHistogram = LatencyHistogram()
+        self._sampleEvery:int = sampleEvery
+        self._callsUntilSample:int = sampleEvery
+
+        cache.startCounting()
+
+        # Bound after startCounting, which swaps in the engine's counting get / put
+        if sampleEvery is None: self.get, self.put = cache.get, cache.put
+
+    def get(self, key):
+        """
+        :type key: int
+        :rtype: int
+        """
+
+        self._callsUntilSample -= 1
+        if self._callsUntilSample: return self.cache.get(key)
+
+        self._callsUntilSample = self._sampleEvery
+        start = time.perf_counter_ns()
+        value = self.cache.get(key)
+        self.getLatency.record(time.perf_counter_ns() - start)
+
+        return value
+
+    def put(self, key, value):
+        """
+        :type key: int
+        :type value: int
+        :rtype: None
+        """
+
+        self._callsUntilSample -= 1
+        if self._callsUntilSample: return self.cache.put(key, value)
+
+        self._callsUntilSample = self._sampleEvery
+        start = time.perf_counter_ns()
+        self.cache.put(key, value)
+        self.putLatency.record(time.perf_counter_ns() - start)
+
+    def __len__(self):
+        return len(self.cache)
+
+    def __contains__(self, key):
+        return key in self.cache
+
+    def stats(self) -> typing.Dict[str, typing.Any]:
+        """
+        Returns a point in time snapshot of the recorded statistics.
+
+        Returns:
+            typing.Dict[str, typing.Any]: {"hits", "misses", "hitRatio", "evictions", "replaces", "inserts", "size", "getLatency", "putLatency"}
+        """
+
+        counters:CacheCounters = self.cache.counters
+        lookups:int = counters.hits + counters.misses
+
+        return {
+            "hits": counters.hits,
+            "misses": counters.misses,
+            "hitRatio": counters.hits / lookups if lookups else None,
+            "evictions": counters.evictions,
+            "replaces": counters.replaces,
+            "inserts": counters.inserts,
+            "size": len(self.cache),
+            "getLatency": self.getLatency.snapshot(),
+            "putLatency": self.putLatency.snapshot(),
+        }
+
+    def resetStats(self):
+        self.cache.counters = CacheCounters()
+        self.getLatency = LatencyHistogram()
+        self.putLatency = LatencyHistogram()
+
+    def exportPrometheus(self, prefix = "textproc_cache") -> str:
+        """
+        Renders the statistics in the Prometheus text exposition format.
+
+        :type prefix: str, metric name prefix
+        :rtype: str
+        """
+
+        stats = self.stats()
+        label = f'cache="{self.name}"'
+        lines:typing.List[str] = []
+
+        for metric, metricType, description, value in (
+            ("hits_total", "counter", "Cache lookups that found the key", stats["hits"]),
+            ("misses_total", "counter", "Cache lookups that did not find the key", stats["misses"]),
+            ("evictions_total", "counter", "Entries removed to make room or because they expired", stats["evictions"]),
+            ("replaces_total", "counter", "Puts that replaced the value of an existing key", stats["replaces"]),
+            ("inserts_total", "counter", "Puts that added a new key", stats["inserts"]),
+            ("size", "gauge", "Entries currently cached", stats["size"]),
+        ):
+            lines.append(f"# HELP {prefix}_{metric} {description}")
+            lines.append(f"# TYPE {prefix}_{metric} {metricType}")
+            lines.append(f"{prefix}_{metric}{{{label}}} {value}")
+
+        for operation in ("get", "put"):
+            histogram = stats[f"{operation}Latency"]
+            metric = f"{prefix}_{operation}_latency_seconds"
+
+            lines.append(f"# HELP {metric} Sampled cache {operation} latency")
+            lines.append(f"# TYPE {metric} histogram")
+            for upperBound, cumulativeCount in histogram["buckets"]:
+                lines.append(f'{metric}_bucket{{{label},le="{"+Inf" if upperBound == float("inf") else repr(upperBound)}"}} {cumulativeCount}')
+            lines.append(f"{metric}_sum{{{label}}} {histogram['sumSeconds']!r}")
+            lines.append(f"{metric}_count{{{label}}} {histogram['count']}")
+
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,198 @@
+import threading, typing
+
+from textproc.lab1_part2 import OrderedLRUCache
+from textproc.cache_stats import CacheCounters
+
+
+class ConcurrentLRUCache(object):
+    """
+    Thread-safe LRU cache that shards keys across independent LRU segments, each guarded by its own lock.
+
+    A key always maps to the same segment (hash(key) % numSegments), so threads working on different segments never
+    contend. Each segment evicts its own least recently used entry, which approximates global LRU order when keys hash
+    evenly across segments.
+    """
+
+    def __init__(self, capacity, numSegments = 16, cacheFactory = OrderedLRUCache):
+        """
+        :type capacity: int
+        :type numSegments: int
+        :type cacheFactory: Callable[[int], cache with get / put / __len__], defaults to OrderedLRUCache
+        """
+        assert capacity > 0, "ERR: capacity must be positive"
+        assert numSegments > 0, "ERR: numSegments must be positive"
+
+        numSegments = min(numSegments, capacity)
+
+        # Spread the capacity so the segments add up to exactly `capacity`
+        self._segments:list = [cacheFactory(capacity // numSegments + (1 if segmentIndex < capacity % numSegments else 0)) for segmentIndex in range(numSegments)]
+        self._locks:typing.List[threading.Lock] = [threading.Lock() for _ in range(numSegments)]
+        self._numSegments:int = numSegments
+        self._capacity:int = capacity
+
+    def get(self, key):
+        """
+        :type key: int
+        :rtype: int
+        """
+
+        segmentIndex = hash(key) % self._numSegments
+
+        with self._locks[segmentIndex]:
+            return self._segments[segmentIndex].get(key)
+
+    def put(self, key, value):
+        """
+        :type key: int
+        :type value: int
+        :rtype: None
+        """
+
+        segmentIndex = hash(key) % self._numSegments
+
+        with self._locks[segmentIndex]:
+            self._segments[segmentIndex].put(key, value)
+
+    def get_many(self, keys):
+        """
+        Batched get. Keys are grouped by segment so each segment lock is taken once per batch instead of once per key.
+
+        :type keys: Iterable[int]
+        :rtype: list[int], the value of every key in order, -1 for keys that are not cached
+        """
+
+        keys = list(keys)
+        values:list = [-1] * len(keys)
+
+        for segmentIndex, positions in self._positionsBySegment(keys).items():
+            segment = self._segments[segmentIndex]
+
+            with self._locks[segmentIndex]:
+                for position in positions: values[position] = segment.get(keys[position])
+
+        return values
+
+    def put_many(self, items):
+        """
+        Batched put. Items are grouped by segment so each segment lock is taken once per batch instead of once per item.
+
+        :type items: Iterable[tuple[int, int]] | dict[int, int]
+        :rtype: None
+        """
+
+        items = list(items.items() if isinstance(items, dict) else items)
+
+        for segmentIndex, positions in self._positionsBySegment([key for key, _ in items]).items():
+            segment = self._segments[segmentIndex]
+
+            with self._locks[segmentIndex]:
+                for position in positions: segment.put(*items[position])
+
+    def _positionsBySegment(self, keys:list) -> typing.Dict[int, typing.List[int]]:
+        """
+        :rtype: {segmentIndex: [positions in `keys` of the keys in that segment, in order]}
+        """
+
+        positionsBySegment:typing.Dict[int, typing.List[int]] = {}
+
+        for position, key in enumerate(keys):
+            positionsBySegment.setdefault(hash(key) % self._numSegments, []).append(position)
+
+        return positionsBySegment
+
+    def __len__(self):
+        total:int = 0
+
+        for segment, lock in zip(self._segments, self._locks):
+            with lock: total += len(segment)
+
+        return total
+
+    def __contains__(self, key):
+        segmentIndex = hash(key) % self._numSegments
+
+        with self._locks[segmentIndex]:
+            return key in self._segments[segmentIndex]
+
+    def startCounting(self):
+        """
+        Counts hits, misses, inserts, replaces and evictions from now on, see InstrumentedCache. Every segment counts its
+        own calls under the segment's lock (see the segment engine's startCounting), `counters` adds them up.
+        """
+
+        for segment, lock in zip(self._segments, self._locks):
+            with lock: segment.startCounting()
+
+    @property
+    def counters(self):
+        """
+        :rtype: CacheCounters, sum of the segments' counters, only set after startCounting
+        """
+
+        return sum((segment.counters for segment in self._segments), CacheCounters())
+
+    @counters.setter
+    def counters(self, counters):
+        """
+        Resets the counters, every segment gets its own fresh counters.
+
+        :type counters: CacheCounters
+        """
+
+        for segment, lock in zip(self._segments, self._locks):
+            with lock: segment.counters = CacheCounters()
+
+
+class AsyncLRUCache(object):
+    """
+    asyncio-friendly wrapper around a ConcurrentLRUCache.
+
+    get / put are coroutines so they can be awaited from request handlers. The segment locks are only held for a single
+    in-memory get / put and never across an await, so the event loop is never blocked on another coroutine, and the same
+    underlying cache can be shared with worker threads.
+    """
+
+    def __init__(self, capacity, numSegments = 16, cacheFactory = OrderedLRUCache, cache = None):
+        """
+        :type capacity: int
+        :type numSegments: int
+        :type cacheFactory: Callable[[int], cache with get / put / __len__], defaults to OrderedLRUCache
+        :type cache: ConcurrentLRUCache | None, existing cache to share instead of creating one
+        """
+        self.cache:ConcurrentLRUCache = cache if cache is not None else ConcurrentLRUCache(capacity, numSegments, cacheFactory)
+
+    async def get(self, key):
+        """
+        :type key: int
+        :rtype: int
+        """
+
+        return self.cache.get(key)
+
+    async def put(self, key, value):
+        """
+        :type key: int
+        :type value: int
+        :rtype: None
+        """
+
+        self.cache.put(key, value)
+
+    async def get_many(self, keys):
+        """
+        :type keys: Iterable[int]
+        :rtype: list[int]
+        """
+
+        return self.cache.get_many(keys)
+
+    async def put_many(self, items):
+        """
+        :type items: Iterable[tuple[int, int]] | dict[int, int]
+        :rtype: None
+        """
+
+        self.cache.put_many(items)
+
+    def __len__(self):
+        return len(self.cache)
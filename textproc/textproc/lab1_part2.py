@@ -1,4 +1,9 @@
+import time, heapq, itertools
 from enum import Enum
+from collections import OrderedDict
+from array import array
+
+from textproc.cache_stats import useCountingClass
 
 class LRUCache(object):
     
@@ -56,7 +61,101 @@ class LRUCache(object):
             newAge:int = self._updateNewestOldestAge(self.Operation.Put)
             
         self._dataFromAge[newAge] = self._dataFromKey[key] = [value, newAge, key]
+    
+    def __len__(self):
+        return len(self._dataFromKey)
         
+    def __contains__(self, key):
+        return key in self._dataFromKey
+
+    def startCounting(self):
+        """
+        Counts hits, misses, inserts, replaces and evictions in `self.counters` from now on, see useCountingClass.
+        """
+        useCountingClass(self, _CountingLRUCache)
+
+    def get_many(self, keys):
+        """
+        Batched get, same result as calling get for every key in order.
+
+        The enum indexes are resolved once and the oldest age is only searched for once per batch instead of per key.
+
+        :type keys: Iterable[int]
+        :rtype: list[int], the value of every key in order, -1 for keys that are not cached
+        """
+
+        dataIndex:int = self.DataIndex.Data.value
+        ageIndex:int = self.DataIndex.Age.value
+        dataFromKey, dataFromAge = self._dataFromKey, self._dataFromAge
+        newestAge:int = self._newestAge
+        values:list = []
+
+        for key in keys:
+            dataItem = dataFromKey.get(key)
+            if dataItem is None:
+                values.append(-1)
+                continue
+
+            del dataFromAge[dataItem[ageIndex]]
+            newestAge += 1
+            dataItem[ageIndex] = newestAge
+            dataFromAge[newestAge] = dataItem
+            values.append(dataItem[dataIndex])
+
+        self._newestAge = newestAge
+        self._advanceOldestAge()
+
+        return values
+
+    def put_many(self, items):
+        """
+        Batched put, same result as calling put for every item in order.
+
+        Every item is inserted first and the entries over capacity are evicted afterwards in one pass. The batch is newer
+        than everything already cached, so evicting the oldest entries at the end removes the same keys as evicting one
+        per put would.
+
+        :type items: Iterable[tuple[int, int]] | dict[int, int]
+        :rtype: None
+        """
+
+        ageIndex:int = self.DataIndex.Age.value
+        keyIndex:int = self.DataIndex.Key.value
+        dataFromKey, dataFromAge = self._dataFromKey, self._dataFromAge
+        newestAge:int = self._newestAge
+
+        for key, value in (items.items() if isinstance(items, dict) else items):
+            dataItem = dataFromKey.get(key)
+            if dataItem is not None: del dataFromAge[dataItem[ageIndex]]
+
+            newestAge += 1
+            dataFromAge[newestAge] = dataFromKey[key] = [value, newestAge, key]
+
+        self._newestAge = newestAge
+
+        if len(dataFromKey) > self._capacity:
+            oldestAge:int = max(self._oldestAge, 0)
+
+            while len(dataFromKey) > self._capacity:
+                while not oldestAge in dataFromAge: oldestAge += 1
+                del dataFromKey[dataFromAge.pop(oldestAge)[keyIndex]]
+
+            self._oldestAge = oldestAge
+
+        self._advanceOldestAge()
+
+    def _advanceOldestAge(self):
+        """
+        Moves self._oldestAge forward to the oldest age still in self._dataFromAge, or -1 if the cache is empty.
+        """
+
+        if len(self._dataFromAge) == 0:
+            self._oldestAge = -1
+            return
+
+        self._oldestAge = max(self._oldestAge, 0)
+        while not self._oldestAge in self._dataFromAge: self._oldestAge += 1
+
     def _updateNewestOldestAge(self, operation:Operation, currentAge:int = -1) -> int:
         """
         Used to retrieve a new age.
@@ -106,6 +205,521 @@ class LRUCache(object):
         
         return self._newestAge
     
+
+
+class _CountingBatches(object):
+    """
+    Counting get_many / put_many of the engines whose put_many evicts after inserting the whole batch. get_many counts
+    its -1 results as misses.
+    """
+
+    def get_many(self, keys):
+        values:list = super().get_many(keys)
+        numMisses:int = values.count(-1)
+
+        self.counters.hits += len(values) - numMisses
+        self.counters.misses += numMisses
+
+        return values
+
+    def put_many(self, items):
+        items = list(items.items() if isinstance(items, dict) else items)
+        numEntries:int = len(self)
+        numInserts:int = len({key for key, _ in items if not key in self})
+
+        super().put_many(items)
+
+        self.counters.inserts += numInserts
+        self.counters.replaces += len(items) - numInserts
+        self.counters.evictions += numEntries + numInserts - len(self)
+
+
+class _CountingLRUCache(_CountingBatches, LRUCache):
+    """
+    LRUCache that counts its calls in `counters`, see LRUCache.startCounting.
+    """
+
+    def get(self, key):
+        if key in self._dataFromKey: self.counters.hits += 1
+        else: self.counters.misses += 1
+
+        return LRUCache.get(self, key)
+
+    def put(self, key, value):
+        if key in self._dataFromKey: self.counters.replaces += 1
+        else:
+            self.counters.inserts += 1
+            if len(self._dataFromKey) >= self._capacity: self.counters.evictions += 1
+
+        LRUCache.put(self, key, value)
+
+
+
+class OrderedLRUCache(object):
+    """
+    LRUCache engine with guaranteed O(1) get / put / evict, behind the same get / put API.
+    
+    Entries are kept in an OrderedDict from least to most recently used, so the entry to evict is always the first one
+    and refreshing an entry is a move_to_end instead of a search for the next oldest age.
+    """
+    
+    def __init__(self, capacity):
+        """
+        :type capacity: int
+        """
+        self._dataFromKey:OrderedDict = OrderedDict()
+        self._capacity:int = capacity
+        
+    def get(self, key):
+        """
+        :type key: int
+        :rtype: int
+        """
+        
+        if not key in self._dataFromKey: return -1
+        
+        self._dataFromKey.move_to_end(key)
+        
+        return self._dataFromKey[key]
+    
+    def put(self, key, value):
+        """
+        :type key: int
+        :type value: int
+        :rtype: None
+        """
+        
+        if key in self._dataFromKey:
+            self._dataFromKey.move_to_end(key)
+            
+        elif len(self._dataFromKey) >= self._capacity:
+            self._dataFromKey.popitem(last=False)
+            
+        self._dataFromKey[key] = value
+
+    def get_many(self, keys):
+        """
+        Batched get, same result as calling get for every key in order.
+
+        :type keys: Iterable[int]
+        :rtype: list[int], the value of every key in order, -1 for keys that are not cached
+        """
+
+        dataFromKey = self._dataFromKey
+        moveToEnd = dataFromKey.move_to_end
+        values:list = []
+
+        for key in keys:
+            if key in dataFromKey:
+                moveToEnd(key)
+                values.append(dataFromKey[key])
+            else:
+                values.append(-1)
+
+        return values
+
+    def put_many(self, items):
+        """
+        Batched put, same result as calling put for every item in order. Entries over capacity are evicted in one pass
+        after the whole batch is inserted.
+
+        :type items: Iterable[tuple[int, int]] | dict[int, int]
+        :rtype: None
+        """
+
+        dataFromKey = self._dataFromKey
+        moveToEnd = dataFromKey.move_to_end
+
+        for key, value in (items.items() if isinstance(items, dict) else items):
+            if key in dataFromKey: moveToEnd(key)
+            dataFromKey[key] = value
+
+        popOldest = dataFromKey.popitem
+        for _ in range(len(dataFromKey) - self._capacity): popOldest(last=False)
+
+    def __len__(self):
+        return len(self._dataFromKey)
+
+    def __contains__(self, key):
+        return key in self._dataFromKey
+
+    def startCounting(self):
+        """
+        Counts hits, misses, inserts, replaces and evictions in `self.counters` from now on, see useCountingClass.
+        """
+        useCountingClass(self, _CountingOrderedLRUCache)
+
+
+class _CountingOrderedLRUCache(_CountingBatches, OrderedLRUCache):
+    """
+    OrderedLRUCache that counts its calls in `counters`, see OrderedLRUCache.startCounting.
+    get / put are copies of OrderedLRUCache's with the counting added, so counting costs no extra call.
+    """
+
+    def get(self, key):
+        if not key in self._dataFromKey:
+            self.counters.misses += 1
+            return -1
+
+        self.counters.hits += 1
+        self._dataFromKey.move_to_end(key)
+
+        return self._dataFromKey[key]
+
+    def put(self, key, value):
+        if key in self._dataFromKey:
+            self._dataFromKey.move_to_end(key)
+            self.counters.replaces += 1
+
+        else:
+            if len(self._dataFromKey) >= self._capacity:
+                self._dataFromKey.popitem(last=False)
+                self.counters.evictions += 1
+
+            self.counters.inserts += 1
+
+        self._dataFromKey[key] = value
+
+
+
+class CompactLRUCache(object):
+    """
+    LRUCache engine that stores entries in parallel arrays preallocated to `capacity`, behind the same get / put API.
+    
+    Every entry lives in a slot number. The recency list is an intrusive doubly linked list of slot numbers held in the
+    `_previousSlot` / `_nextSlot` int arrays, with slot `capacity` as the sentinel: `_nextSlot[sentinel]` is the most
+    recently used slot and `_previousSlot[sentinel]` the least recently used one. Unused slots form a free list chained
+    through `_nextSlot`. Passing a `keyTypecode` / `valueTypecode` (e.g. 'q') stores keys / values in an `array`
+    of machine ints instead of a list of Python object references.
+    """
+    
+    # `counters` is only set by startCounting
+    __slots__ = ("_capacity", "_slotFromKey", "_keys", "_values", "_previousSlot", "_nextSlot", "_sentinel", "_freeSlot", "counters")
+    
+    def __init__(self, capacity, keyTypecode = None, valueTypecode = None):
+        """
+        :type capacity: int
+        :type keyTypecode: str | None
+        :type valueTypecode: str | None
+        """
+        self._capacity:int = capacity
+        self._slotFromKey:dict = {}
+        self._keys = array(keyTypecode, bytes(array(keyTypecode).itemsize * capacity)) if keyTypecode else [None] * capacity
+        self._values = array(valueTypecode, bytes(array(valueTypecode).itemsize * capacity)) if valueTypecode else [None] * capacity
+        
+        slotTypecode = 'i' if capacity < 2**31 - 1 else 'q'
+        self._sentinel:int = capacity
+        self._previousSlot:array = array(slotTypecode, [capacity]) * (capacity + 1)
+        self._nextSlot:array = array(slotTypecode, range(1, capacity + 2))
+        self._nextSlot[capacity] = capacity
+        
+        # Free list: 0 -> 1 -> ... -> capacity - 1 -> -1
+        if capacity > 0: self._nextSlot[capacity - 1] = -1
+        self._freeSlot:int = 0 if capacity > 0 else -1
+
+    def get(self, key):
+        """
+        :type key: int
+        :rtype: int
+        """
+        
+        slot = self._slotFromKey.get(key)
+        if slot is None: return -1
+        
+        self._moveToFront(slot)
+        
+        return self._values[slot]
+    
+    def put(self, key, value):
+        """
+        :type key: int
+        :type value: int
+        :rtype: None
+        """
+        
+        slot = self._slotFromKey.get(key)
+        if slot is not None:
+            self._values[slot] = value
+            self._moveToFront(slot)
+            return
+        
+        if self._freeSlot != -1:
+            slot = self._freeSlot
+            self._freeSlot = self._nextSlot[slot]
+            
+        elif self._capacity > 0:
+            # Evict the least recently used slot and reuse it
+            slot = self._previousSlot[self._sentinel]
+            del self._slotFromKey[self._keys[slot]]
+            self._unlink(slot)
+            
+        else: return
+        
+        self._keys[slot] = key
+        self._values[slot] = value
+        self._slotFromKey[key] = slot
+        self._linkFront(slot)
+
+    def get_many(self, keys):
+        """
+        Batched get, same result as calling get for every key in order.
+
+        :type keys: Iterable[int]
+        :rtype: list[int], the value of every key in order, -1 for keys that are not cached
+        """
+
+        get = self.get
+        return [get(key) for key in keys]
+
+    def put_many(self, items):
+        """
+        Batched put, same result as calling put for every item in order.
+        Slots are reused in place on eviction, so there is no separate bulk eviction pass to save.
+
+        :type items: Iterable[tuple[int, int]] | dict[int, int]
+        :rtype: None
+        """
+
+        put = self.put
+        for key, value in (items.items() if isinstance(items, dict) else items): put(key, value)
+
+    def __len__(self):
+        return len(self._slotFromKey)
+        
+    def __contains__(self, key):
+        return key in self._slotFromKey
+        
+    def startCounting(self):
+        """
+        Counts hits, misses, inserts, replaces and evictions in `self.counters` from now on, see useCountingClass.
+        """
+        useCountingClass(self, _CountingCompactLRUCache)
+        
+    def _unlink(self, slot:int):
+        previousSlot, nextSlot = self._previousSlot[slot], self._nextSlot[slot]
+        self._nextSlot[previousSlot] = nextSlot
+        self._previousSlot[nextSlot] = previousSlot
+        
+    def _linkFront(self, slot:int):
+        frontSlot = self._nextSlot[self._sentinel]
+        self._previousSlot[slot] = self._sentinel
+        self._nextSlot[slot] = frontSlot
+        self._previousSlot[frontSlot] = slot
+        self._nextSlot[self._sentinel] = slot
+        
+    def _moveToFront(self, slot:int):
+        if self._nextSlot[self._sentinel] == slot: return
+        
+        self._unlink(slot)
+        self._linkFront(slot)
+    
+
+
+class _CountingCompactLRUCache(CompactLRUCache):
+    """
+    CompactLRUCache that counts its calls in `counters`, see CompactLRUCache.startCounting.
+    get_many / put_many call get / put, so they are counted too.
+    """
+
+    __slots__ = ()
+
+    def get(self, key):
+        slot = self._slotFromKey.get(key)
+        if slot is None:
+            self.counters.misses += 1
+            return -1
+
+        self.counters.hits += 1
+        self._moveToFront(slot)
+
+        return self._values[slot]
+
+    def put(self, key, value):
+        if key in self._slotFromKey: self.counters.replaces += 1
+        elif self._capacity > 0:
+            self.counters.inserts += 1
+            if self._freeSlot == -1: self.counters.evictions += 1
+
+        CompactLRUCache.put(self, key, value)
+
+
+
+class ExpiringLRUCache(object):
+    """
+    LRU cache with per-entry time to live and size-aware eviction, behind the same get / put API.
+    
+    * Expiry: an entry older than its ttl is dropped lazily when it is read, and all expired entries are dropped
+      periodically (at most once every `expiryInterval` seconds during put, or whenever expire() is called).
+      Expiry times are kept in a heap so a sweep only touches entries that actually expired.
+    * Size: `weigher(key, value)` returns the weight of an entry (e.g. its size in bytes) and `capacity` is the
+      largest total weight the cache may hold. Least recently used entries are evicted until a new entry fits.
+      Without a weigher every entry weighs 1, so capacity is an item count like LRUCache.
+    """
+    
+    def __init__(self, capacity, ttl = None, weigher = None, expiryInterval = 1.0, clock = time.monotonic):
+        """
+        :type capacity: int, largest total weight
+        :type ttl: float | None, default seconds an entry lives for, None to never expire
+        :type weigher: Callable[[key, value], int] | None
+        :type expiryInterval: float, seconds between periodic expiry sweeps
+        :type clock: Callable[[], float]
+        """
+        # {key: (value, expiresAt, weight)} from least to most recently used
+        self._dataFromKey:OrderedDict = OrderedDict()
+        # [(expiresAt, sequence, key)], may hold stale items for keys that were replaced or evicted
+        self._expiryHeap:list = []
+        self._sequence = itertools.count()
+        self._capacity:int = capacity
+        self._ttl = ttl
+        self._weigher = weigher
+        self._totalWeight:int = 0
+        self._expiryInterval:float = expiryInterval
+        self._clock = clock
+        self._nextExpiry:float = clock() + expiryInterval
+        
+    def get(self, key):
+        """
+        :type key: int
+        :rtype: int
+        """
+        
+        if not key in self._dataFromKey: return -1
+        
+        value, expiresAt, _ = self._dataFromKey[key]
+        if expiresAt <= self._clock():
+            self._remove(key)
+            return -1
+        
+        self._dataFromKey.move_to_end(key)
+        
+        return value
+    
+    def put(self, key, value, ttl = None):
+        """
+        :type key: int
+        :type value: int
+        :type ttl: float | None, overrides the cache's default ttl for this entry
+        :rtype: None
+        """
+        
+        now = self._clock()
+        if now >= self._nextExpiry: self.expire()
+        
+        if key in self._dataFromKey: self._remove(key)
+        
+        weight = self._weigher(key, value) if self._weigher else 1
+        if weight > self._capacity: return # Could never fit, caching it would only flush everything else
+        
+        while self._totalWeight + weight > self._capacity:
+            self._remove(next(iter(self._dataFromKey)))
+        
+        ttl = ttl if ttl is not None else self._ttl
+        expiresAt = now + ttl if ttl is not None else float("inf")
+        
+        self._dataFromKey[key] = (value, expiresAt, weight)
+        self._totalWeight += weight
+        
+        if ttl is not None:
+            heapq.heappush(self._expiryHeap, (expiresAt, next(self._sequence), key))
+            
+            # Drop stale heap items once they outnumber the live entries
+            if len(self._expiryHeap) > 2 * len(self._dataFromKey) + 64:
+                self._expiryHeap = [(entryExpiresAt, sequence, entryKey) for entryExpiresAt, sequence, entryKey in self._expiryHeap
+                                    if entryKey in self._dataFromKey and self._dataFromKey[entryKey][1] == entryExpiresAt]
+                heapq.heapify(self._expiryHeap)
+    
+    def expire(self):
+        """
+        Removes every expired entry.
+        
+        :rtype: int, number of entries removed
+        """
+        
+        now = self._clock()
+        self._nextExpiry = now + self._expiryInterval
+        numRemoved:int = 0
+        
+        while self._expiryHeap and self._expiryHeap[0][0] <= now:
+            expiresAt, _, key = heapq.heappop(self._expiryHeap)
+            
+            # Skip heap items left behind by entries that were since replaced or evicted
+            if key in self._dataFromKey and self._dataFromKey[key][1] == expiresAt:
+                self._remove(key)
+                numRemoved += 1
+                
+        return numRemoved
+    
+    @property
+    def weight(self):
+        """
+        :rtype: int, total weight of the cached entries
+        """
+        return self._totalWeight
+    
+    def __len__(self):
+        return len(self._dataFromKey)
+    
+    def __contains__(self, key):
+        return key in self._dataFromKey and self._dataFromKey[key][1] > self._clock()
+    
+    def startCounting(self):
+        """
+        Counts hits, misses, inserts, replaces and evictions in `self.counters` from now on, see useCountingClass.
+        """
+        useCountingClass(self, _CountingExpiringLRUCache)
+    
+    def _remove(self, key):
+        _, _, weight = self._dataFromKey.pop(key)
+        self._totalWeight -= weight
+
+
+
+class _CountingExpiringLRUCache(ExpiringLRUCache):
+    """
+    ExpiringLRUCache that counts its calls in `counters`, see ExpiringLRUCache.startCounting. Expired entries count as
+    evictions, and reading an expired entry also counts as a miss.
+    """
+
+    def get(self, key):
+        counters = self.counters
+
+        if not key in self._dataFromKey:
+            counters.misses += 1
+            return -1
+
+        value, expiresAt, _ = self._dataFromKey[key]
+        if expiresAt <= self._clock():
+            self._remove(key)
+            counters.misses += 1
+            counters.evictions += 1
+            return -1
+
+        counters.hits += 1
+        self._dataFromKey.move_to_end(key)
+
+        return value
+
+    def put(self, key, value, ttl = None):
+        counters = self.counters
+        isNew:bool = not key in self._dataFromKey
+
+        if isNew: counters.inserts += 1
+        else: counters.replaces += 1
+
+        numEntries:int = len(self._dataFromKey)
+        numEvictions:int = counters.evictions
+
+        ExpiringLRUCache.put(self, key, value, ttl)
+
+        # Set rather than added to, every entry put removed is an eviction, including the ones its expiry sweep already counted
+        counters.evictions = numEvictions + numEntries + isNew - len(self._dataFromKey)
+
+    def expire(self):
+        numRemoved:int = ExpiringLRUCache.expire(self)
+        self.counters.evictions += numRemoved
+
+        return numRemoved
+    
             
 if __name__ == "__main__":
     # * TEST 1
@@ -0,0 +1,104 @@
+import asyncio, functools, inspect, threading, typing
+from concurrent.futures import Future
+
+from textproc.lab1_part2 import OrderedLRUCache
+
+
+# Separates positional from keyword arguments in the default cache key, like functools.lru_cache does
+_KEYWORD_ARGUMENTS_MARK = object()
+
+
+def _makeKey(args:tuple, kwargs:dict) -> tuple:
+    return args + (_KEYWORD_ARGUMENTS_MARK,) + tuple(sorted(kwargs.items())) if kwargs else args
+
+
+def cached(cache = None, key = None):
+    """
+    Decorator that memoizes a `def` or `async def` function in an LRU cache engine.
+
+    Concurrent calls with the same key are coalesced (singleflight): the first call computes the result while the
+    others wait for it, so a burst of calls on a cold key runs the function once. Exceptions are passed to every waiting
+    caller and are not cached.
+
+    Results are stored wrapped in a 1-tuple, so a result of -1 is not mistaken for the engines' -1 miss value.
+    Pass the engine to InstrumentedCache to turn on its hit / miss counters, they also count the decorator's calls.
+
+    Usage:
+        @cached(cache=OrderedLRUCache(1024), key=lambda resumeText, jobDescription: (hash(resumeText), hash(jobDescription)))
+        async def compute_resume_job_match(resumeText, jobDescription): ...
+
+    Args:
+        * cache (optional): Cache engine with get / put that stores arbitrary values. Defaults to OrderedLRUCache(128).
+        * key (Callable, optional): Called with the function's arguments, returns the hashable cache key.
+            * Defaults to the positional arguments plus the sorted keyword arguments.
+
+    Returns:
+        * Callable: Decorator, the decorated function exposes its engine as `.cache`
+    """
+
+    cache = cache if cache is not None else OrderedLRUCache(128)
+    makeKey = (lambda args, kwargs: key(*args, **kwargs)) if key is not None else _makeKey
+
+    def decorator(function):
+        if inspect.iscoroutinefunction(function):
+            inFlightTasks:typing.Dict[typing.Hashable, asyncio.Task] = {}
+
+            @functools.wraps(function)
+            async def asyncWrapper(*args, **kwargs):
+                cacheKey = makeKey(args, kwargs)
+
+                cachedResult = cache.get(cacheKey)
+                if cachedResult != -1: return cachedResult[0]
+
+                task = inFlightTasks.get(cacheKey)
+                if task is None:
+                    task = inFlightTasks[cacheKey] = asyncio.ensure_future(function(*args, **kwargs))
+                    task.add_done_callback(functools.partial(_storeTaskResult, cacheKey))
+
+                # Shielded so a cancelled caller does not cancel the computation the other callers wait on
+                return await asyncio.shield(task)
+
+            def _storeTaskResult(cacheKey, task:asyncio.Task):
+                del inFlightTasks[cacheKey]
+                if not task.cancelled() and task.exception() is None: cache.put(cacheKey, (task.result(),))
+
+            asyncWrapper.cache = cache
+            return asyncWrapper
+
+        inFlightFutures:typing.Dict[typing.Hashable, Future] = {}
+        # Guards the cache and inFlightFutures, so engines that are not thread-safe can be shared between threads
+        lock:threading.Lock = threading.Lock()
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            cacheKey = makeKey(args, kwargs)
+
+            with lock:
+                cachedResult = cache.get(cacheKey)
+                if cachedResult != -1: return cachedResult[0]
+
+                future = inFlightFutures.get(cacheKey)
+                isLeader:bool = future is None
+                if isLeader: future = inFlightFutures[cacheKey] = Future()
+
+            if not isLeader: return future.result()
+
+            try:
+                result = function(*args, **kwargs)
+
+            except BaseException as error:
+                with lock: del inFlightFutures[cacheKey]
+                future.set_exception(error)
+                raise
+
+            with lock:
+                cache.put(cacheKey, (result,))
+                del inFlightFutures[cacheKey]
+
+            future.set_result(result)
+            return result
+
+        wrapper.cache = cache
+        return wrapper
+
+    return decorator
@@ -0,0 +1,528 @@
+import os, tempfile, threading, typing, zlib
+from multiprocessing import resource_tracker, shared_memory
+
+try:
+    import fcntl
+except ImportError: # Not available on Windows, SharedLRUCache raises ImportError there
+    fcntl = None
+
+from textproc.cache_stats import CacheCounters, useCountingClass
+
+
+# Int fields of the cache header at the start of the shared memory block. _HEADER_MAGIC is written last, so a block
+# without it was never completely set up
+_HEADER_MAGIC, _HEADER_CAPACITY, _HEADER_KEY_SIZE, _HEADER_VALUE_SIZE, _HEADER_NUM_STRIPES = range(5)
+_HEADER_INTS:int = 5
+_MAGIC:int = 0x4C525543 # "LRUC"
+
+# Int fields of every slot, stored in one int array after the stripe headers and bucket tables
+_SLOT_PREVIOUS, _SLOT_NEXT, _SLOT_CHAIN, _SLOT_KEY_LENGTH, _SLOT_VALUE_LENGTH = range(5)
+_SLOT_INTS:int = 5
+
+# Int fields of every stripe header. _STRIPE_HEAD is the most recently used slot and _STRIPE_TAIL the least recently used
+_STRIPE_HEAD, _STRIPE_TAIL, _STRIPE_FREE, _STRIPE_COUNT = range(4)
+_STRIPE_HEADER_INTS:int = 4
+
+_INT_SIZE:int = 4
+
+
+class _StripeLock(object):
+    """
+    Lock that excludes both the other threads of this process (threading.Lock) and other processes (an fcntl lock on
+    one byte of the lock file).
+    """
+
+    __slots__ = ("threadLock", "_lockFile", "_offset")
+
+    def __init__(self, lockFile, offset:int):
+        self.threadLock:threading.Lock = threading.Lock()
+        self._lockFile = lockFile
+        self._offset:int = offset
+
+    def __enter__(self):
+        self.threadLock.acquire()
+
+        try:
+            fcntl.lockf(self._lockFile, fcntl.LOCK_EX, 1, self._offset)
+        except BaseException:
+            self.threadLock.release()
+            raise
+
+    def __exit__(self, *exc):
+        fcntl.lockf(self._lockFile, fcntl.LOCK_UN, 1, self._offset)
+        self.threadLock.release()
+
+
+class _LockFile(object):
+    """
+    Lock file of a SharedLRUCache: byte 0 guards setting up the shared memory block and byte 1 + i stripe i.
+
+    fcntl locks belong to a process. They do not exclude the threads of the process that holds them, and closing any
+    descriptor of the file drops all of the process's locks on it. So every SharedLRUCache of a process on the same
+    lock file shares one _LockFile (see open), which adds a thread lock to every fcntl lock and keeps the file open
+    until its last user closes it.
+    """
+
+    _openLockFiles:typing.Dict[str, "_LockFile"] = {} # Key: lock file path, Value: _LockFile of this process
+    _openLockFilesLock:threading.Lock = threading.Lock()
+
+    def __init__(self, path:str, numStripes:int):
+        self.path:str = path
+        self._file = open(path, "ab")
+        self.setupLock:_StripeLock = _StripeLock(self._file, 0)
+        self.stripeLocks:typing.List[_StripeLock] = [_StripeLock(self._file, 1 + stripeIndex) for stripeIndex in range(numStripes)]
+        self._numUsers:int = 0
+
+    @classmethod
+    def open(cls, path:str, numStripes:int) -> "_LockFile":
+        with cls._openLockFilesLock:
+            lockFile = cls._openLockFiles.get(path)
+            if lockFile is None: lockFile = cls._openLockFiles[path] = cls(path, numStripes)
+
+            lockFile._numUsers += 1
+
+            return lockFile
+
+    def close(self):
+        with self._openLockFilesLock:
+            self._numUsers -= 1
+            if self._numUsers: return
+
+            del self._openLockFiles[self.path]
+            self._file.close()
+
+    @classmethod
+    def _resetThreadLocks(cls):
+        """
+        Runs in the child after a fork. A thread lock held by another thread of the parent would never be released in
+        the child, the fcntl locks are not inherited at all.
+        """
+
+        for lockFile in cls._openLockFiles.values():
+            for stripeLock in [lockFile.setupLock] + lockFile.stripeLocks: stripeLock.threadLock = threading.Lock()
+
+        cls._openLockFilesLock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"): os.register_at_fork(after_in_child=_LockFile._resetThreadLocks)
+
+
+def _lockFilePath(memoryName:str) -> str:
+    return os.path.join(tempfile.gettempdir(), f"{memoryName.lstrip('/')}.lock")
+
+
+class SharedLRUCache(object):
+    """
+    LRU cache for byte string keys / values stored in a multiprocessing.shared_memory block, so every process on a host
+    shares one cache instead of keeping its own copy.
+
+    Keys are hashed (crc32, which unlike hash() is the same in every process) to one of `numStripes` stripes. Each
+    stripe is an independent LRU with its own lock, a chained hash table of bucket -> slot and a doubly linked
+    recency list of slots, all kept as int32s in shared memory (see CompactLRUCache for the same layout in one
+    process). Keys and values are copied into fixed-size slots of `keySize` / `valueSize` bytes.
+
+    The stripe locks are fcntl locks on one byte per stripe of a lock file in the temp folder (plus a threading.Lock
+    per stripe for the threads of a process), so they also work between processes that were started separately:
+    * With a `name`, every process that creates a SharedLRUCache of that name and size attaches to the same block, the
+      first one creates it. This is how separately started workers share a cache (e.g. uvicorn --workers, where
+      every worker imports the app on its own). The block outlives the processes, remove it with unlink().
+    * Without a `name`, the cache reaches other processes by being passed to them (pickled, e.g. as a
+      multiprocessing.Process / Pool argument, or inherited by a fork). The process that created it removes the block
+      and its lock file on close().
+
+    A stripe lock costs two fcntl system calls, so get / put take a few microseconds. fcntl is POSIX only, on Windows
+    SharedLRUCache raises ImportError.
+
+    Usage:
+        # In every worker, e.g. at import time of the app
+        cache = SharedLRUCache(10_000, keySize=32, valueSize=256, name="resume-matches")
+        cache.put(b"key", b"value")
+        cache.get(b"key")
+    """
+
+    def __init__(self, capacity, keySize, valueSize, numStripes = 16, name = None):
+        """
+        :type capacity: int
+        :type keySize: int, maximum key length in bytes
+        :type valueSize: int, maximum value length in bytes
+        :type numStripes: int
+        :type name: str | None, name of the shared memory block to create or attach to, None for a new unnamed block
+        """
+        if fcntl is None: raise ImportError("SharedLRUCache requires fcntl, which is only available on POSIX systems")
+
+        assert capacity > 0, "ERR: capacity must be positive"
+        assert keySize > 0 and valueSize >= 0, "ERR: keySize must be positive and valueSize must not be negative"
+        assert numStripes > 0, "ERR: numStripes must be positive"
+
+        numStripes = min(numStripes, capacity)
+        stripeCapacities:typing.List[int] = [capacity // numStripes + (1 if stripeIndex < capacity % numStripes else 0) for stripeIndex in range(numStripes)]
+
+        self._capacity:int = capacity
+        self._keySize:int = keySize
+        self._valueSize:int = valueSize
+        self._numStripes:int = numStripes
+        self._numBuckets:int = 1 << (max(stripeCapacities) - 1).bit_length() # Per stripe, load factor <= 1
+        self._isNamed:bool = name is not None
+
+        numInts:int = _HEADER_INTS + numStripes * (_STRIPE_HEADER_INTS + self._numBuckets) + capacity * _SLOT_INTS
+        size:int = numInts * _INT_SIZE + capacity * (keySize + valueSize)
+
+        if name is None:
+            # Nobody else can reach the block before this constructor returns, so it is set up without the setup lock
+            self._memory = shared_memory.SharedMemory(create=True, size=size)
+            self._ownerProcessId:typing.Optional[int] = os.getpid()
+            self._attach()
+            self._setUp(stripeCapacities)
+            return
+
+        self._ownerProcessId = None
+        lockFile = _LockFile.open(_lockFilePath(name), numStripes)
+
+        try:
+            with lockFile.setupLock:
+                try:
+                    self._memory = shared_memory.SharedMemory(name, create=True, size=size)
+                except FileExistsError:
+                    self._memory = shared_memory.SharedMemory(name)
+
+                if self._memory.size < size:
+                    resource_tracker.unregister(self._memory._name, "shared_memory")
+                    self._memory.close()
+                    raise AssertionError(f"ERR: Shared memory block {name!r} holds a smaller cache")
+
+                self._attach()
+
+                header = self._header
+                if header[_HEADER_MAGIC] != _MAGIC: # Created just now, or its creator died while setting it up
+                    self._setUp(stripeCapacities)
+
+                if (header[_HEADER_CAPACITY], header[_HEADER_KEY_SIZE], header[_HEADER_VALUE_SIZE], header[_HEADER_NUM_STRIPES]) != (capacity, keySize, valueSize, numStripes):
+                    self._detach()
+                    raise AssertionError(f"ERR: Shared memory block {name!r} holds a cache with a different capacity, keySize, valueSize or numStripes")
+
+        finally:
+            # _attach opened the lock file again, closing this reference while holding the setup lock would drop it
+            lockFile.close()
+
+    def _setUp(self, stripeCapacities:typing.List[int]):
+        # Stripe headers, every stripe's free list chains its own slots through _SLOT_NEXT
+        ints = self._ints
+        firstSlot:int = 0
+        for stripeIndex, stripeCapacity in enumerate(stripeCapacities):
+            header:int = stripeIndex * _STRIPE_HEADER_INTS
+            ints[header + _STRIPE_HEAD] = ints[header + _STRIPE_TAIL] = -1
+            ints[header + _STRIPE_FREE] = firstSlot
+            ints[header + _STRIPE_COUNT] = 0
+
+            for slot in range(firstSlot, firstSlot + stripeCapacity):
+                ints[self._slotBase + slot * _SLOT_INTS + _SLOT_NEXT] = slot + 1 if slot + 1 < firstSlot + stripeCapacity else -1
+
+            firstSlot += stripeCapacity
+
+        for bucket in range(self._bucketBase, self._slotBase): ints[bucket] = -1
+
+        self._header[_HEADER_CAPACITY] = self._capacity
+        self._header[_HEADER_KEY_SIZE] = self._keySize
+        self._header[_HEADER_VALUE_SIZE] = self._valueSize
+        self._header[_HEADER_NUM_STRIPES] = self._numStripes
+        self._header[_HEADER_MAGIC] = _MAGIC
+
+    def _attach(self):
+        """
+        Maps the views on the shared memory block and opens the lock file.
+        """
+
+        if self._isNamed:
+            # A named block outlives the processes using it (see unlink), so the resource tracker must not remove it when
+            # this process exits
+            resource_tracker.unregister(self._memory._name, "shared_memory")
+
+        headerSize:int = _HEADER_INTS * _INT_SIZE
+        self._bucketBase:int = self._numStripes * _STRIPE_HEADER_INTS
+        self._slotBase:int = self._bucketBase + self._numStripes * self._numBuckets
+        intsSize:int = (self._slotBase + self._capacity * _SLOT_INTS) * _INT_SIZE
+
+        self._header:memoryview = self._memory.buf[:headerSize].cast('i')
+        self._ints:memoryview = self._memory.buf[headerSize:headerSize + intsSize].cast('i')
+        self._bytes:memoryview = self._memory.buf[headerSize + intsSize:headerSize + intsSize + self._capacity * (self._keySize + self._valueSize)]
+
+        self._lockFile:_LockFile = _LockFile.open(_lockFilePath(self._memory.name), self._numStripes)
+        self._locks:typing.List[_StripeLock] = self._lockFile.stripeLocks
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        for unpicklable in ("_memory", "_header", "_ints", "_bytes", "_lockFile", "_locks"): del state[unpicklable]
+        state["_memoryName"] = self._memory.name
+
+        return state
+
+    def __setstate__(self, state):
+        memoryName = state.pop("_memoryName")
+        self.__dict__.update(state)
+        self._memory = shared_memory.SharedMemory(name=memoryName)
+        self._attach()
+
+    def get(self, key):
+        """
+        :type key: bytes
+        :rtype: bytes | int, -1 if the key is not cached
+        """
+
+        keyHash:int = zlib.crc32(key)
+        stripeIndex:int = keyHash % self._numStripes
+
+        with self._locks[stripeIndex]:
+            slot:int = self._findSlot(stripeIndex, keyHash, key)
+            if slot == -1: return -1
+
+            self._moveToFront(stripeIndex, slot)
+
+            return self._readValue(slot)
+
+    def put(self, key, value):
+        """
+        :type key: bytes
+        :type value: bytes
+        :rtype: None
+        """
+        assert len(key) <= self._keySize, f"ERR: key is longer than keySize ({self._keySize} bytes)"
+        assert len(value) <= self._valueSize, f"ERR: value is longer than valueSize ({self._valueSize} bytes)"
+
+        keyHash:int = zlib.crc32(key)
+        stripeIndex:int = keyHash % self._numStripes
+
+        with self._locks[stripeIndex]:
+            slot:int = self._findSlot(stripeIndex, keyHash, key)
+
+            if slot != -1:
+                self._writeValue(slot, value)
+                self._moveToFront(stripeIndex, slot)
+                return
+
+            self._insert(stripeIndex, keyHash, key, value)
+
+    def __len__(self):
+        total:int = 0
+
+        for stripeIndex, lock in enumerate(self._locks):
+            with lock: total += self._ints[stripeIndex * _STRIPE_HEADER_INTS + _STRIPE_COUNT]
+
+        return total
+
+    def __contains__(self, key):
+        keyHash:int = zlib.crc32(key)
+        stripeIndex:int = keyHash % self._numStripes
+
+        with self._locks[stripeIndex]:
+            return self._findSlot(stripeIndex, keyHash, key) != -1
+
+    def startCounting(self):
+        """
+        Counts hits, misses, inserts, replaces and evictions in `self.counters` from now on, see useCountingClass.
+        The counters are kept per process and only count that process's calls.
+        """
+        useCountingClass(self, _CountingSharedLRUCache)
+
+    def close(self):
+        """
+        Detaches this process from the shared memory block. An unnamed block is also removed if this process created it.
+        """
+
+        self._detach()
+
+        if os.getpid() == self._ownerProcessId:
+            self._memory.unlink()
+
+            try:
+                os.remove(self._lockFile.path)
+            except FileNotFoundError:
+                pass
+
+    def _detach(self):
+        self._header.release()
+        self._ints.release()
+        self._bytes.release()
+        self._memory.close()
+        self._lockFile.close()
+
+    def unlink(self):
+        """
+        Removes a named shared memory block, processes that are attached to it keep using it until they close it. The next
+        SharedLRUCache with its name creates a new, empty block. The lock file is left behind, removing it while another
+        process opens it would give the two processes different locks.
+        """
+        assert self._isNamed, "ERR: An unnamed block is removed by close() in the process that created it"
+
+        # SharedMemory.unlink unregisters the block from the resource tracker, which _attach already did
+        resource_tracker.register(self._memory._name, "shared_memory")
+        self._memory.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _findSlot(self, stripeIndex:int, keyHash:int, key:bytes) -> int:
+        """
+        :rtype: int, slot holding `key` or -1
+        """
+
+        ints = self._ints
+        slotSize:int = self._keySize + self._valueSize
+        slot:int = ints[self._bucketBase + stripeIndex * self._numBuckets + (keyHash // self._numStripes) % self._numBuckets]
+
+        while slot != -1:
+            slotFields:int = self._slotBase + slot * _SLOT_INTS
+
+            if ints[slotFields + _SLOT_KEY_LENGTH] == len(key) and self._bytes[slot * slotSize:slot * slotSize + len(key)] == key:
+                return slot
+
+            slot = ints[slotFields + _SLOT_CHAIN]
+
+        return -1
+
+    def _unchain(self, stripeIndex:int, slot:int):
+        """
+        Removes `slot` from its hash bucket chain.
+        """
+
+        ints = self._ints
+        slotOffset:int = slot * (self._keySize + self._valueSize)
+        keyHash:int = zlib.crc32(self._bytes[slotOffset:slotOffset + ints[self._slotBase + slot * _SLOT_INTS + _SLOT_KEY_LENGTH]])
+        bucket:int = self._bucketBase + stripeIndex * self._numBuckets + (keyHash // self._numStripes) % self._numBuckets
+
+        if ints[bucket] == slot:
+            ints[bucket] = ints[self._slotBase + slot * _SLOT_INTS + _SLOT_CHAIN]
+            return
+
+        chainSlot:int = ints[bucket]
+        while ints[self._slotBase + chainSlot * _SLOT_INTS + _SLOT_CHAIN] != slot:
+            chainSlot = ints[self._slotBase + chainSlot * _SLOT_INTS + _SLOT_CHAIN]
+
+        ints[self._slotBase + chainSlot * _SLOT_INTS + _SLOT_CHAIN] = ints[self._slotBase + slot * _SLOT_INTS + _SLOT_CHAIN]
+
+    def _insert(self, stripeIndex:int, keyHash:int, key:bytes, value:bytes) -> bool:
+        """
+        Adds a key that is not cached to its stripe, the caller holds the stripe's lock.
+
+        Returns:
+            bool: True if the stripe's least recently used entry was evicted to make room
+        """
+
+        ints = self._ints
+        header:int = stripeIndex * _STRIPE_HEADER_INTS
+        isEvicting:bool = ints[header + _STRIPE_FREE] == -1
+
+        if not isEvicting:
+            slot:int = ints[header + _STRIPE_FREE]
+            ints[header + _STRIPE_FREE] = ints[self._slotBase + slot * _SLOT_INTS + _SLOT_NEXT]
+
+        else:
+            # Evict the least recently used slot of this stripe and reuse it
+            slot = ints[header + _STRIPE_TAIL]
+            self._unlink(stripeIndex, slot)
+            self._unchain(stripeIndex, slot)
+            ints[header + _STRIPE_COUNT] -= 1
+
+        slotFields:int = self._slotBase + slot * _SLOT_INTS
+        slotOffset:int = slot * (self._keySize + self._valueSize)
+        self._bytes[slotOffset:slotOffset + len(key)] = key
+        ints[slotFields + _SLOT_KEY_LENGTH] = len(key)
+        self._writeValue(slot, value)
+
+        bucket:int = self._bucketBase + stripeIndex * self._numBuckets + (keyHash // self._numStripes) % self._numBuckets
+        ints[slotFields + _SLOT_CHAIN] = ints[bucket]
+        ints[bucket] = slot
+
+        self._linkFront(stripeIndex, slot)
+        ints[header + _STRIPE_COUNT] += 1
+
+        return isEvicting
+
+    def _readValue(self, slot:int) -> bytes:
+        valueOffset:int = slot * (self._keySize + self._valueSize) + self._keySize
+        return bytes(self._bytes[valueOffset:valueOffset + self._ints[self._slotBase + slot * _SLOT_INTS + _SLOT_VALUE_LENGTH]])
+
+    def _writeValue(self, slot:int, value:bytes):
+        valueOffset:int = slot * (self._keySize + self._valueSize) + self._keySize
+        self._bytes[valueOffset:valueOffset + len(value)] = value
+        self._ints[self._slotBase + slot * _SLOT_INTS + _SLOT_VALUE_LENGTH] = len(value)
+
+    def _unlink(self, stripeIndex:int, slot:int):
+        ints = self._ints
+        header:int = stripeIndex * _STRIPE_HEADER_INTS
+        slotFields:int = self._slotBase + slot * _SLOT_INTS
+        previousSlot, nextSlot = ints[slotFields + _SLOT_PREVIOUS], ints[slotFields + _SLOT_NEXT]
+
+        if previousSlot == -1: ints[header + _STRIPE_HEAD] = nextSlot
+        else: ints[self._slotBase + previousSlot * _SLOT_INTS + _SLOT_NEXT] = nextSlot
+
+        if nextSlot == -1: ints[header + _STRIPE_TAIL] = previousSlot
+        else: ints[self._slotBase + nextSlot * _SLOT_INTS + _SLOT_PREVIOUS] = previousSlot
+
+    def _linkFront(self, stripeIndex:int, slot:int):
+        ints = self._ints
+        header:int = stripeIndex * _STRIPE_HEADER_INTS
+        slotFields:int = self._slotBase + slot * _SLOT_INTS
+        frontSlot:int = ints[header + _STRIPE_HEAD]
+
+        ints[slotFields + _SLOT_PREVIOUS] = -1
+        ints[slotFields + _SLOT_NEXT] = frontSlot
+
+        if frontSlot == -1: ints[header + _STRIPE_TAIL] = slot
+        else: ints[self._slotBase + frontSlot * _SLOT_INTS + _SLOT_PREVIOUS] = slot
+
+        ints[header + _STRIPE_HEAD] = slot
+
+    def _moveToFront(self, stripeIndex:int, slot:int):
+        if self._ints[stripeIndex * _STRIPE_HEADER_INTS + _STRIPE_HEAD] == slot: return
+
+        self._unlink(stripeIndex, slot)
+        self._linkFront(stripeIndex, slot)
+
+
+class _CountingSharedLRUCache(SharedLRUCache):
+    """
+    SharedLRUCache that counts its calls in `counters`, see SharedLRUCache.startCounting. The counters are updated under
+    the stripe locks, so they are exact when threads share the cache. A copy passed to another process starts with
+    its own zeroed counters.
+    """
+
+    def __setstate__(self, state):
+        SharedLRUCache.__setstate__(self, state)
+        self.counters = CacheCounters()
+
+    def get(self, key):
+        keyHash:int = zlib.crc32(key)
+        stripeIndex:int = keyHash % self._numStripes
+
+        with self._locks[stripeIndex]:
+            slot:int = self._findSlot(stripeIndex, keyHash, key)
+            if slot == -1:
+                self.counters.misses += 1
+                return -1
+
+            self.counters.hits += 1
+            self._moveToFront(stripeIndex, slot)
+
+            return self._readValue(slot)
+
+    def put(self, key, value):
+        assert len(key) <= self._keySize, f"ERR: key is longer than keySize ({self._keySize} bytes)"
+        assert len(value) <= self._valueSize, f"ERR: value is longer than valueSize ({self._valueSize} bytes)"
+
+        keyHash:int = zlib.crc32(key)
+        stripeIndex:int = keyHash % self._numStripes
+
+        with self._locks[stripeIndex]:
+            slot:int = self._findSlot(stripeIndex, keyHash, key)
+
+            if slot != -1:
+                self._writeValue(slot, value)
+                self._moveToFront(stripeIndex, slot)
+                self.counters.replaces += 1
+                return
+
+            self.counters.inserts += 1
+            if self._insert(stripeIndex, keyHash, key, value): self.counters.evictions += 1